@@ -7,8 +7,22 @@ information."""
 import argparse
 import sys
 
+from inputfuncs.cache_functions import set_cache_ttl
+from inputfuncs.scraper_functions import (
+    set_offline_mode,
+    set_url_override,
+    set_request_settings
+)
+from inputfuncs.record_functions import (
+    DEFAULT_RECORD_DIRECTORY,
+    set_record_directory
+)
 from scraper import find_all_operator_info
 from recruitop import find_recruitment_combos
+from sync import sync_game_data
+from diff import diff_snapshots
+from serve import serve_recording
+from crawl import crawl_gamepress
 from recruitfuncs.tag_shortcut_editor import (
     create_tag_shortcut,
     list_tag_shortcuts,
@@ -77,6 +91,35 @@ def initialize_scraper_args(
         action="store_true"
     )
 
+    parser.add_argument(
+        "-r", "--refresh",
+        help="""Forgets any gamepress.gg page of the specified
+                operators that was kept from an earlier lookup, so
+                the page is downloaded again.
+                """,
+        action="store_true"
+    )
+    parser.add_argument(
+        "--hedge",
+        help="""For operators that haven't been seen in the JSONs
+                before, looks on gamepress.gg at the same time as in
+                the JSONs, and uses whichever finds the operator
+                first. Useful for newly released operators.
+                """,
+        action="store_true"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        help="""Looks up the specified operators in N threads at once,
+                with one progress line instead of a spinner for each
+                operator. The info is still printed in the order the
+                operators were given (default 1).
+                """,
+        metavar="N",
+        type=int,
+        default=1
+    )
+
     parser.add_argument(
         "-a", "--all",
         help="""Displays all the information about this
@@ -235,6 +278,131 @@ def initialize_recruit_args(
         func=find_recruitment_combos
     )
 
+
+def initialize_sync_args(
+        parser: argparse.ArgumentParser
+) -> None:
+    """Set up the `sync` subcommand's flags and arguments."""
+    parser.set_defaults(
+        func=sync_game_data
+    )
+
+
+def initialize_diff_args(
+        parser: argparse.ArgumentParser
+) -> None:
+    """Set up the `diff` subcommand's flags and arguments."""
+    parser.add_argument(
+        "old",
+        help="""The older snapshot to compare. Defaults to the
+                snapshot from before the last sync that changed
+                anything.
+                """,
+        nargs="?",
+        type=str
+    )
+    parser.add_argument(
+        "new",
+        help="""The newer snapshot to compare. Defaults to the
+                current snapshot.
+                """,
+        nargs="?",
+        type=str
+    )
+    parser.set_defaults(
+        func=diff_snapshots
+    )
+
+
+def initialize_crawl_args(
+        parser: argparse.ArgumentParser
+) -> None:
+    """Set up the `crawl` subcommand's flags and arguments."""
+    parser.add_argument(
+        "operator",
+        help="""Only crawl these operators (named the same way as for
+                `scraper`). Defaults to every operator in the
+                Gamepress stat rankings.
+                """,
+        nargs="*",
+        type=str
+    )
+    parser.add_argument(
+        "-d", "--directory",
+        help="""Where to save the crawled operators and the
+                checkpoint. Overrides the directory in
+                `src/info/scraper/crawlSettings.txt`.
+                """,
+        type=str
+    )
+    parser.add_argument(
+        "-c", "--concurrency",
+        help="How many pages are crawled at once.",
+        metavar="N",
+        type=int
+    )
+    parser.add_argument(
+        "--rate",
+        help="""The most pages downloaded per second, on average
+                (pages that are already cached don't count).
+                """,
+        metavar="PAGES",
+        type=float
+    )
+    parser.add_argument(
+        "-v", "--vskills",
+        help="""Saves the 1st tier, 7th tier, and M3 (if possible)
+                tier of each skill, instead of only the max tier.
+                """,
+        action="store_true"
+    )
+    parser.add_argument(
+        "-r", "--refresh",
+        help="""Downloads every page again, even if it was kept from
+                an earlier lookup.
+                """,
+        action="store_true"
+    )
+    parser.add_argument(
+        "--restart",
+        help="""Crawls every operator again, instead of skipping the
+                ones an earlier crawl already finished.
+                """,
+        action="store_true"
+    )
+    parser.set_defaults(
+        func=crawl_gamepress
+    )
+
+
+def initialize_serve_args(
+        parser: argparse.ArgumentParser
+) -> None:
+    """Set up the `serve` subcommand's flags and arguments."""
+    parser.add_argument(
+        "directory",
+        help=f"""The recording to serve. Defaults to
+                `{DEFAULT_RECORD_DIRECTORY}`.
+                """,
+        nargs="?",
+        type=str
+    )
+    parser.add_argument(
+        "-p", "--port",
+        help="The port to serve on (default 8777).",
+        type=int,
+        default=8777
+    )
+    parser.add_argument(
+        "--host",
+        help="The address to serve on (default 127.0.0.1).",
+        type=str,
+        default="127.0.0.1"
+    )
+    parser.set_defaults(
+        func=serve_recording
+    )
+
 ######################################
 
 
@@ -257,6 +425,78 @@ def initialize_parsers() -> argparse.ArgumentParser:
         action="version",
         version=VERSION
     )
+    parser.add_argument(
+        "--cache-ttl",
+        help="""How many seconds a downloaded JSON is trusted before
+                asking the server whether it changed. Overrides the
+                ttl in `src/info/cache/cacheSettings.txt`. Use 0 to
+                always check for changes.
+                """,
+        metavar="SECONDS",
+        type=int
+    )
+    parser.add_argument(
+        "--http-timeout",
+        help="""How many seconds to wait for a server to send data
+                before giving up on a request. Overrides the
+                ARK_HTTP_TIMEOUT environment variable and
+                `src/info/scraper/requestSettings.txt`.
+                """,
+        metavar="SECONDS",
+        type=float
+    )
+    parser.add_argument(
+        "--http-retries",
+        help="""How many times a failed request is tried again.
+                Overrides ARK_HTTP_RETRIES.
+                """,
+        metavar="N",
+        type=int
+    )
+    parser.add_argument(
+        "--http-backoff",
+        help="""The base number of seconds to wait before retrying
+                a request, doubled every retry. Overrides
+                ARK_HTTP_BACKOFF.
+                """,
+        metavar="SECONDS",
+        type=float
+    )
+    parser.add_argument(
+        "--offline",
+        help="""Never use the network. Everything is read from the
+                snapshot (see `sync`) or from what was downloaded
+                before, no matter how old it is, and how old the data
+                is gets printed as well.
+                """,
+        action="store_true"
+    )
+    parser.add_argument(
+        "--record",
+        help=f"""Records every response that is used into
+                `{DEFAULT_RECORD_DIRECTORY}` (or the directory given
+                with --record-dir), laid out by url path, so that
+                `serve` can play them back later.
+                """,
+        action="store_true"
+    )
+    parser.add_argument(
+        "--record-dir",
+        help="""The directory --record records into. Giving a
+                directory turns on --record as well.
+                """,
+        metavar="DIRECTORY",
+        type=str
+    )
+    parser.add_argument(
+        "--url-override",
+        help="""Sends every request to this server (eg.
+                http://127.0.0.1:8777) instead, keeping each url's
+                path. Overrides the ARK_URL_OVERRIDE environment
+                variable.
+                """,
+        metavar="BASE_URL"
+    )
     parser.set_defaults(
         version=VERSION,
         func=handle_no_func
@@ -286,6 +526,49 @@ def initialize_parsers() -> argparse.ArgumentParser:
     )
     initialize_recruit_args(recruitment_parser)
 
+    # Initialize syncing functionality
+    sync_parser = subparsers.add_parser(
+        "sync",
+        description="""Download every data source this program uses
+                    and compile them into one compact local snapshot.
+                    Once a snapshot exists, `scraper` and `recruitop`
+                    read from it instead of the network. Run this
+                    again whenever you want newer data.
+                    """
+    )
+    initialize_sync_args(sync_parser)
+
+    # Initialize diffing functionality
+    diff_parser = subparsers.add_parser(
+        "diff",
+        description="""Show which operators, skills, talents, base
+                    skills and recruitment tags were added, removed or
+                    changed between two snapshots made by `sync`.
+                    """
+    )
+    initialize_diff_args(diff_parser)
+
+    # Initialize crawling functionality
+    crawl_parser = subparsers.add_parser(
+        "crawl",
+        description="""Gather every operator's information from
+                    gamepress.gg in one go, politely: only a few pages
+                    are downloaded at once, at a limited rate. A
+                    stopped crawl picks up where it left off.
+                    """
+    )
+    initialize_crawl_args(crawl_parser)
+
+    # Initialize playback functionality
+    serve_parser = subparsers.add_parser(
+        "serve",
+        description="""Serve a recording made with --record on this
+                    machine, so that it can be played back with
+                    --url-override without the network.
+                    """
+    )
+    initialize_serve_args(serve_parser)
+
     return parser
 
 
@@ -295,6 +578,19 @@ def start_parser() -> None:
     parser = initialize_parsers()
     # Parse args and call the appropriate function
     args = parser.parse_args()
+
+    if args.cache_ttl is not None:
+        set_cache_ttl(args.cache_ttl)
+    set_offline_mode(args.offline)
+    if args.record or args.record_dir is not None:
+        set_record_directory(args.record_dir or DEFAULT_RECORD_DIRECTORY)
+    set_url_override(args.url_override)
+    set_request_settings(
+        read_timeout=args.http_timeout,
+        retries=args.http_retries,
+        backoff=args.http_backoff
+    )
+
     args.func(args)
 
 
@@ -0,0 +1,227 @@
+"""This module contains all the implementation for the 'crawl'
+function in the 'ark' library, which gathers every operator's
+information from Gamepress in one go.
+
+The crawl is polite: only a few pages are downloaded at once, and a
+token bucket keeps the average rate of requests under a set limit.
+Pages go through the page cache, so pages that were downloaded
+recently don't cost a request at all. Every crawled operator is saved
+as it finishes, along with a checkpoint, so a crawl that was stopped
+picks up where it left off."""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from operatorclasses.operator import Operator
+
+from inputfuncs.input_reader import (
+    get_temporary_path,
+    read_lines_into_dict
+)
+from inputfuncs.cache_functions import is_page_cached
+from inputfuncs.progress_line import ProgressLine
+from inputfuncs.token_bucket import TokenBucket
+from inputfuncs.scraper_functions import (
+    get_operator_url,
+    forget_operator_page
+)
+from scraperfuncs.data_context import DataContext
+from scraperfuncs.gamepress_search_functions import get_stat_rankings
+from scraper import get_info_from_gamepress
+
+
+### FUNCTIONS ########################
+
+
+def get_crawl_settings(args: argparse.Namespace) -> Dict[str, Any]:
+    """Retrieves the crawl settings from
+    `info/scraper/crawlSettings.txt`, with anything given on the
+    command line taking its place, and returns them as a dict."""
+    settings = read_lines_into_dict("./info/scraper/crawlSettings.txt")
+
+    return {
+        "directory": args.directory or settings["directory"],
+        "concurrency": max(
+            args.concurrency or int(settings["concurrency"]), 1
+        ),
+        # A rate of 0 would never let a request through
+        "rate": max(args.rate or float(settings["rate"]), 0.01),
+        "burst": float(settings["burst"]),
+    }
+
+
+def get_operator_slug(title: str) -> str:
+    """Turns an operator's Gamepress title into the name their page is
+    found under (eg. "Rosa (Poca)" becomes "rosa-poca")."""
+    return re.sub(
+        r"[^a-z0-9]+", "-", re.sub(r"['’]", "", title.lower())
+    ).strip("-")
+
+
+def get_roster() -> List[str]:
+    """Retrieves the page name of every operator on Gamepress, in the
+    order the stat rankings list them.
+
+    Returns an empty list if the stat rankings can't be retrieved.
+    """
+    roster = []
+
+    for operator in get_stat_rankings():
+        slug = get_operator_slug(operator["title"])
+        if slug != "" and slug not in roster:
+            roster.append(slug)
+
+    return roster
+
+
+def operator_to_dict(operator: Operator) -> Dict[str, Any]:
+    """Turns an Operator object into a dict that can be saved as JSON,
+    and returns it."""
+    return {
+        "name": operator.name,
+        "rarity": operator.rarity,
+        "profession": operator.profession,
+        "description": operator.description,
+        "tags": operator.tags,
+        "stats": operator.stats,
+        "properties": {
+            prop: operator.get_property(prop)
+            for prop in operator.get_all_properties()
+        },
+    }
+
+
+def load_checkpoint(directory: str) -> List[str]:
+    """Loads the page names of every operator an earlier crawl into
+    the specified directory already finished, and returns them.
+
+    Returns an empty list if nothing was crawled there yet.
+    """
+    try:
+        with open(
+                os.path.join(directory, "checkpoint.json"),
+                "r",
+                encoding="utf8"
+        ) as f:
+            return json.load(f)["done"]
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def write_checkpoint(directory: str, done: List[str]) -> None:
+    """Writes the page names of every operator that was crawled so far
+    into the checkpoint."""
+    checkpoint_path = os.path.join(directory, "checkpoint.json")
+    temporary_path = get_temporary_path(checkpoint_path)
+
+    with open(temporary_path, "w", encoding="utf8") as f:
+        json.dump({"done": done}, f)
+    os.replace(temporary_path, checkpoint_path)
+
+
+def save_operator(directory: str, slug: str, operator: Operator) -> None:
+    """Saves a crawled operator as `<directory>/operators/<slug>.json`."""
+    operator_path = os.path.join(directory, "operators", slug + ".json")
+    temporary_path = get_temporary_path(operator_path)
+
+    with open(temporary_path, "w", encoding="utf8") as f:
+        json.dump(operator_to_dict(operator), f, ensure_ascii=False)
+    os.replace(temporary_path, operator_path)
+
+
+def crawl_gamepress(args: argparse.Namespace) -> None:
+    """Crawls the Gamepress page of every operator (or only the
+    specified operators), saves everything found about each one and
+    prints a summary to the screen. Nothing is returned.
+
+    Operators finished by an earlier crawl into the same directory are
+    skipped, unless the restart flag is specified. Operators that
+    couldn't be crawled aren't checkpointed, so the next crawl tries
+    them again.
+    """
+    settings = get_crawl_settings(args)
+    directory = settings["directory"]
+    os.makedirs(os.path.join(directory, "operators"), exist_ok=True)
+
+    roster = args.operator if len(args.operator) > 0 else get_roster()
+    if len(roster) == 0:
+        sys.stdout.write(
+            "\n\nCould not find any operators to crawl! "
+            + "Either the server is down, or you're offline.\n\n"
+        )
+        return
+
+    done = [] if args.restart else load_checkpoint(directory)
+    remaining = [slug for slug in roster if slug not in done]
+
+    # Everything is gathered, the same way `scraper -g -a` would
+    lookup_args = argparse.Namespace(
+        all=True,
+        skills=False,
+        vskills=args.vskills,
+        info=False,
+        talent=False,
+        base=False,
+        gamepress=True
+    )
+    context = DataContext()
+    bucket = TokenBucket(settings["rate"], settings["burst"])
+    checkpoint_lock = threading.Lock()
+    progress = ProgressLine("Crawling", len(remaining))
+    failed = []
+
+    def crawl_operator(slug):
+        if args.refresh:
+            forget_operator_page(slug)
+
+        # Only pages that have to be downloaded count towards the rate
+        if not is_page_cached(get_operator_url(slug)):
+            bucket.acquire()
+
+        operator = get_info_from_gamepress(lookup_args, slug, context)
+
+        with checkpoint_lock:
+            if operator is None:
+                failed.append(slug)
+            else:
+                save_operator(directory, slug, operator)
+                done.append(slug)
+                write_checkpoint(directory, done)
+
+        progress.advance()
+
+    progress.start()
+    try:
+        with ThreadPoolExecutor(
+                max_workers=settings["concurrency"]
+        ) as executor:
+            # list() to wait for every operator (and see any errors)
+            list(executor.map(crawl_operator, remaining))
+    finally:
+        progress.finish()
+
+    sys.stdout.write(
+        f"\n\nCrawled {len(remaining) - len(failed)} operators "
+        + f"({len(roster) - len(remaining)} already crawled) "
+        + f"into '{directory}'\n"
+    )
+    if len(failed) > 0:
+        sys.stdout.write(
+            f"Could not crawl {len(failed)} operators (run `crawl` "
+            + "again to retry them): "
+            + ", ".join(failed)
+            + "\n"
+        )
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
@@ -0,0 +1,370 @@
+"""This module contains all the implementation for the 'diff'
+function in the 'ark' library, which compares two snapshots made by
+`ark sync` and shows which operators, skills, talents, base skills
+and recruitment tags were added, removed or changed between them.
+
+The comparison is done on the compiled snapshot sections themselves,
+keyed by character key (or skill id, or recruitment name), so nothing
+has to be rendered to be compared. Sections whose source didn't change
+between the snapshots aren't even loaded."""
+
+import argparse
+import datetime
+import sys
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+from inputfuncs.snapshot_functions import (
+    get_snapshot_path,
+    read_snapshot_header,
+    load_snapshot_section
+)
+
+# Which fields of a compiled operator count as which kind of change.
+# Talents are compared on their own.
+OPERATOR_FIELDS = {
+    "name": "name",
+    "rarity": "rarity",
+    "profession": "profession",
+    "description": "description",
+    "itemUsage": "description",
+    "itemDesc": "description",
+    "tagList": "tags",
+    "phases": "stats",
+    "skills": "skills",
+}
+RECRUIT_FIELDS = {
+    "level": "rarity",
+    "tags": "tags",
+    "type": "profession",
+    "hidden": "availability",
+    "globalHidden": "availability",
+}
+
+### FUNCTIONS ########################
+
+
+def diff_keyed(
+        old: Mapping[str, Any],
+        new: Mapping[str, Any],
+        describe_change: Callable[[Any, Any], List[str]]
+) -> Tuple[List[str], List[str], List[Tuple[str, List[str]]]]:
+    """Compares two dictionaries that are keyed the same way, and
+    returns a tuple of (added keys, removed keys, changed keys).
+
+    Each changed key comes as a tuple of (key, details), where the
+    details are whatever describe_change() says changed between the
+    old and new value.
+    """
+    added = [key for key in new.keys() if key not in old.keys()]
+    removed = [key for key in old.keys() if key not in new.keys()]
+    changed = [
+        (key, describe_change(old[key], new[key]))
+        for key in new.keys()
+        if key in old.keys() and old[key] != new[key]
+    ]
+
+    return added, removed, changed
+
+
+def describe_field_changes(
+        fields: Mapping[str, str]
+) -> Callable[[Mapping[str, Any], Mapping[str, Any]], List[str]]:
+    """Creates a function that describes which of the specified fields
+    changed between two dictionaries, using the name each field
+    is matched with (and only mentioning each name once)."""
+    def describe_change(old, new):
+        details = []
+
+        for field, field_name in fields.items():
+            if old.get(field) != new.get(field) \
+                    and field_name not in details:
+                details.append(field_name)
+
+        return details
+
+    return describe_change
+
+
+def describe_skill_change(
+        old: Mapping[str, Any],
+        new: Mapping[str, Any]
+) -> List[str]:
+    """Describes which levels of a skill changed between two versions
+    of it."""
+    if len(old["levels"]) != len(new["levels"]):
+        return ["levels"]
+
+    return [
+        f"level {level + 1}"
+        for level, (old_level, new_level)
+        in enumerate(zip(old["levels"], new["levels"]))
+        if old_level != new_level
+    ]
+
+
+def describe_list_change(
+        get_entry_name: Callable[[Mapping[str, Any]], str]
+) -> Callable[[Any, Any], List[str]]:
+    """Creates a function that describes which entries of a list of
+    dictionaries were added, removed or changed. Entries are matched
+    (and named) by get_entry_name(), so it has to give every entry in
+    a list a different name."""
+    def describe_change(old, new):
+        old_entries = {get_entry_name(entry): entry for entry in old}
+        new_entries = {get_entry_name(entry): entry for entry in new}
+        added, removed, changed = diff_keyed(
+            old_entries, new_entries, lambda old, new: []
+        )
+
+        return (
+            ["+" + name for name in added]
+            + ["-" + name for name in removed]
+            + [name for name, _ in changed]
+        )
+
+    return describe_change
+
+
+def strip_talents(
+        operators: Mapping[str, Any]
+) -> Dict[str, Dict[str, Any]]:
+    """Returns every operator without their talents, since talents
+    are compared on their own."""
+    return {
+        operator_key: {
+            field: value
+            for field, value in operator_dict.items()
+            if field != "talents"
+        }
+        for operator_key, operator_dict in operators.items()
+    }
+
+
+def extract_all_talents(
+        operators: Mapping[str, Any]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Flattens every operator's talents into one list of talent
+    stages per operator, keyed by character key."""
+    return {
+        operator_key: [
+            stage
+            for talent in operator_dict["talents"]
+            for stage in talent["candidates"]
+        ]
+        for operator_key, operator_dict in operators.items()
+    }
+
+
+def get_talent_stage_name(stage: Mapping[str, Any]) -> str:
+    """Names a talent stage by its talent's name and when it unlocks
+    (eg. "Tactical Chant E2 Pot1"), since every stage of a talent
+    shares the talent's name."""
+    return (
+        stage["name"]
+        + " E" + str(stage["unlockCondition"]["phase"])
+        + " Pot" + str(stage["requiredPotentialRank"] + 1)
+    )
+
+
+def extract_all_base_skills(
+        base_skills: Mapping[str, Any],
+        riic: Mapping[str, Any]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Joins every operator's base skills with their names and
+    descriptions from the riic section, keyed by character key."""
+    return {
+        operator_key: [
+            {
+                "buffId": bskill["buffId"],
+                "cond": bskill["cond"],
+                **base_skills["buffs"].get(bskill["buffId"], {}),
+                **riic.get(bskill["buffId"], {}),
+            }
+            for bchar in char["buffChar"]
+            for bskill in bchar["buffData"]
+        ]
+        for operator_key, char in base_skills["chars"].items()
+    }
+
+
+def format_changes(
+        title: str,
+        changes: Tuple[List[str], List[str], List[Tuple[str, List[str]]]],
+        get_display_name: Callable[[str], str]
+) -> List[str]:
+    """Formats the added, removed and changed keys of one kind of data
+    into a list of messages, and returns it."""
+    added, removed, changed = changes
+
+    messages = [
+        f"{title} ({len(added)} added, {len(removed)} removed, "
+        + f"{len(changed)} changed)"
+    ]
+    messages += [f"  + {get_display_name(key)}" for key in added]
+    messages += [f"  - {get_display_name(key)}" for key in removed]
+    messages += [
+        f"  ~ {get_display_name(key)}"
+        + (": " + ", ".join(details) if len(details) > 0 else "")
+        for key, details in changed
+    ]
+
+    return messages
+
+
+def compare_snapshots(
+        old_path: str,
+        new_path: str
+) -> List[str]:
+    """Compares two snapshots and returns a list of messages that
+    describe every difference between them.
+
+    A kind of data is only compared if one of the sources it is
+    compiled from has a different hash in the two snapshots.
+    """
+    old_header = read_snapshot_header(old_path)
+    new_header = read_snapshot_header(new_path)
+
+    def source_changed(name):
+        return old_header["sources"].get(name) \
+            != new_header["sources"].get(name)
+
+    # Sections are loaded at most once, and only when needed
+    loaded_sections = {}
+
+    def load_sections(name):
+        if name not in loaded_sections.keys():
+            loaded_sections[name] = (
+                load_snapshot_section(name, old_path),
+                load_snapshot_section(name, new_path)
+            )
+
+        return loaded_sections[name]
+
+    def get_operator_name(operator_key):
+        old_operators, new_operators = load_sections("operators")
+        operator_dict = new_operators.get(
+            operator_key, old_operators.get(operator_key)
+        )
+
+        # Some operators only exist in the base skill JSON
+        if operator_dict is None:
+            return operator_key
+
+        return f"{operator_dict['name']} ({operator_key})"
+
+    messages = []
+
+    if source_changed("operators"):
+        old_operators, new_operators = load_sections("operators")
+
+        messages += format_changes(
+            "Operators",
+            diff_keyed(
+                strip_talents(old_operators),
+                strip_talents(new_operators),
+                describe_field_changes(OPERATOR_FIELDS)
+            ),
+            get_operator_name
+        )
+        messages += format_changes(
+            "Talents",
+            diff_keyed(
+                extract_all_talents(old_operators),
+                extract_all_talents(new_operators),
+                describe_list_change(get_talent_stage_name)
+            ),
+            get_operator_name
+        )
+
+    if source_changed("skills"):
+        old_skills, new_skills = load_sections("skills")
+
+        def get_skill_name(skill_id):
+            skill = new_skills.get(skill_id, old_skills.get(skill_id))
+            if len(skill["levels"]) == 0:
+                return skill_id
+
+            return f"{skill['levels'][0]['name']} ({skill_id})"
+
+        messages += format_changes(
+            "Skills",
+            diff_keyed(old_skills, new_skills, describe_skill_change),
+            get_skill_name
+        )
+
+    if source_changed("base_skills") or source_changed("riic"):
+        old_base_skills, new_base_skills = load_sections("base_skills")
+        old_riic, new_riic = load_sections("riic")
+
+        messages += format_changes(
+            "Base skills",
+            diff_keyed(
+                extract_all_base_skills(old_base_skills, old_riic),
+                extract_all_base_skills(new_base_skills, new_riic),
+                describe_list_change(lambda bskill: bskill["buffId"])
+            ),
+            get_operator_name
+        )
+
+    if source_changed("recruit"):
+        old_recruit, new_recruit = load_sections("recruit")
+
+        messages += format_changes(
+            "Recruitment tags",
+            diff_keyed(
+                {operator["name_en"]: operator for operator in old_recruit},
+                {operator["name_en"]: operator for operator in new_recruit},
+                describe_field_changes(RECRUIT_FIELDS)
+            ),
+            lambda name: name
+        )
+
+    return messages
+
+
+def format_snapshot_time(header: Mapping[str, Any]) -> str:
+    """Formats when a snapshot was created, for display."""
+    return datetime.datetime.fromtimestamp(
+        header["created"]
+    ).strftime("%Y-%m-%d %H:%M")
+
+
+def diff_snapshots(args: argparse.Namespace) -> None:
+    """Compares two snapshots (by default, the snapshot from before the
+    last sync that changed anything and the current one) and prints
+    every difference to the screen. Nothing is returned.
+    """
+    old_path = args.old or get_snapshot_path() + ".prev"
+    new_path = args.new or get_snapshot_path()
+
+    try:
+        old_header = read_snapshot_header(old_path)
+        new_header = read_snapshot_header(new_path)
+    except (OSError, ValueError):
+        sys.stdout.write(
+            "\n\nThere are no two snapshots to compare! Run `ark.py sync` "
+            + "again once the data changed upstream.\n\n"
+        )
+        return
+
+    messages = compare_snapshots(old_path, new_path)
+
+    sys.stdout.write(
+        "\n\nChanges from "
+        + format_snapshot_time(old_header)
+        + " to "
+        + format_snapshot_time(new_header)
+        + "\n\n"
+    )
+
+    if len(messages) == 0:
+        sys.stdout.write("Nothing changed.\n")
+    for message in messages:
+        sys.stdout.write(message + "\n")
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
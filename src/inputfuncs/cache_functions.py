@@ -0,0 +1,503 @@
+"""A module that contains functions related to storing fetched files
+on disk, so that files that haven't changed don't have to be
+downloaded again.
+
+JSONs are kept forever and revalidated with the server, while
+Gamepress pages are kept in a size-bounded page cache that forgets
+the least recently used pages first. The final output for an operator
+can be kept as well, tagged with the version of the data it was made
+from."""
+
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import (
+    Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+)
+
+from inputfuncs.input_reader import (
+    get_temporary_path,
+    read_lines_into_dict
+)
+from inputfuncs.json_stream_functions import load_json
+
+
+# Set through set_cache_ttl() when a ttl is given on the command line
+_ttl_override = None
+
+
+class CachedResponse:
+    """A small stand-in for a `requests.Response` object, holding a
+    body that was loaded from the disk cache instead of the network.
+
+    Only the parts of a Response that this program actually uses
+    are available here.
+
+    If no body is given, the body is left in the disk cache under the
+    url until it is asked for, and json() decodes it straight from the
+    disk, one entry at a time.
+
+    Public variables:
+
+    url -- string,
+
+    content -- bytes,
+
+    status_code -- int
+
+    Public methods:
+
+    json()
+
+    """
+
+    def __init__(self, url: str, content: Optional[bytes] = None) -> None:
+        """Initializes a CachedResponse object.
+
+        Keyword arguments:
+
+        url -- string, the url the body was originally fetched from
+
+        content -- bytes, the cached body, or None to read it from the
+        disk cache when needed (default None)
+        """
+        self.url = url
+        self._content = content
+        self.status_code = 200
+
+    @property
+    def content(self) -> bytes:
+        """Retrieves the cached body, reading it from the disk cache
+        first if needed."""
+        if self._content is None:
+            self._content = read_cached_body(self.url)
+
+        return self._content
+
+    @property
+    def text(self) -> str:
+        """Retrieves the cached body, decoded as a string."""
+        return self.content.decode("utf8")
+
+    def json(self) -> Any:
+        """Decodes the cached body as JSON and returns the result."""
+        if self._content is None:
+            return load_json(iter_cached_body(self.url))
+
+        return json.loads(self._content)
+
+
+def get_cache_directory() -> str:
+    """Retrieves the directory that all cached files are stored in."""
+    return read_lines_into_dict(
+        "./info/cache/cacheSettings.txt"
+    )["directory"]
+
+
+def get_cache_ttl() -> int:
+    """Retrieves how long (in seconds) a cached file is trusted
+    without asking the server whether it changed."""
+    if _ttl_override is not None:
+        return _ttl_override
+
+    return int(read_lines_into_dict(
+        "./info/cache/cacheSettings.txt"
+    )["ttl"])
+
+
+def set_cache_ttl(ttl: int) -> None:
+    """Overrides the time-to-live found in the cache settings file for
+    the rest of this run."""
+    global _ttl_override
+    _ttl_override = ttl
+
+
+def _get_entry_path(url: str) -> str:
+    """Returns the path (without extension) a url is cached under."""
+    url_hash = hashlib.sha1(url.encode("utf8")).hexdigest()
+
+    return os.path.join(get_cache_directory(), "http", url_hash)
+
+
+def load_cache_entry(url: str) -> Optional[Dict[str, Any]]:
+    """Loads the metadata of a cached url and returns it.
+
+    Returns None if the url was never cached, or if the cached body
+    went missing.
+    """
+    entry_path = _get_entry_path(url)
+
+    if not os.path.isfile(entry_path + ".body"):
+        return None
+
+    try:
+        with open(entry_path + ".json", "r", encoding="utf8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_cached_body(url: str) -> bytes:
+    """Reads the cached body of a url and returns it as bytes."""
+    with open(_get_entry_path(url) + ".body", "rb") as f:
+        return f.read()
+
+
+def iter_cached_body(
+        url: str,
+        chunk_size: int = 65536
+) -> Iterator[bytes]:
+    """Reads the cached body of a url a chunk at a time, so that the
+    whole body never has to be held at once."""
+    with open(_get_entry_path(url) + ".body", "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+
+            yield chunk
+
+
+def is_cache_entry_fresh(entry: Mapping[str, Any]) -> bool:
+    """Checks to see if a cache entry was checked against the server
+    recently enough that it can be used without a request."""
+    return time.time() - entry["checked"] < get_cache_ttl()
+
+
+def build_revalidation_headers(
+        entry: Optional[Mapping[str, Any]]
+) -> Dict[str, str]:
+    """Creates the headers that let the server reply with a
+    `304 Not Modified` instead of the full file if the cached copy
+    is still good.
+
+    Returns an empty dict if there is nothing cached.
+    """
+    headers = {}
+
+    if entry is None:
+        return headers
+
+    if entry["etag"] is not None:
+        headers["If-None-Match"] = entry["etag"]
+    if entry["last_modified"] is not None:
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    return headers
+
+
+def _write_entry_metadata(url: str, entry: Mapping[str, Any]) -> None:
+    """Writes the metadata of a cache entry to disk."""
+    entry_path = _get_entry_path(url)
+
+    temporary_path = get_temporary_path(entry_path + ".json")
+
+    with open(temporary_path, "w", encoding="utf8") as f:
+        json.dump(entry, f)
+    os.replace(temporary_path, entry_path + ".json")
+
+
+def store_cache_entry(
+        url: str,
+        content: Iterable[bytes],
+        headers: Mapping[str, str]
+) -> Dict[str, Any]:
+    """Stores a freshly downloaded body along with the validators
+    (ETag/Last-Modified) the server sent with it, and returns the
+    new cache entry's metadata.
+
+    The body can be given whole (as bytes), or as an iterable of
+    chunks, which are written (and hashed) as they arrive so that the
+    whole body never has to be held at once.
+
+    The body is written to a temporary file first so that a crash
+    halfway through never leaves a broken file in the cache.
+    """
+    entry_path = _get_entry_path(url)
+    os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+    if isinstance(content, bytes):
+        content = [content]
+
+    body_hash = hashlib.sha256()
+    temporary_path = get_temporary_path(entry_path + ".body")
+
+    try:
+        with open(temporary_path, "wb") as f:
+            for chunk in content:
+                f.write(chunk)
+                body_hash.update(chunk)
+    except BaseException:
+        # The download broke off, so the old body (if any) is kept
+        os.remove(temporary_path)
+        raise
+    os.replace(temporary_path, entry_path + ".body")
+
+    now = time.time()
+    entry = {
+        "url": url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "sha256": body_hash.hexdigest(),
+        "fetched": now,
+        "checked": now,
+    }
+    _write_entry_metadata(url, entry)
+
+    return entry
+
+
+def mark_cache_entry_checked(url: str) -> None:
+    """Records that the server just confirmed the cached copy of a url
+    is still up to date, restarting its time-to-live."""
+    entry = load_cache_entry(url)
+
+    if entry is not None:
+        entry["checked"] = time.time()
+        _write_entry_metadata(url, entry)
+
+
+def get_page_cache_settings() -> Dict[str, int]:
+    """Retrieves how long (in seconds) a cached page is used for, and
+    how many bytes the page cache is allowed to take up, as a dict
+    with the keys `page_ttl` and `page_cache_size`."""
+    settings = read_lines_into_dict("./info/cache/cacheSettings.txt")
+
+    return {
+        "page_ttl": int(settings["page_ttl"]),
+        "page_cache_size": int(settings["page_cache_size"]),
+    }
+
+
+def _get_page_directory() -> str:
+    """Returns the directory that cached pages are stored in."""
+    return os.path.join(get_cache_directory(), "pages")
+
+
+def _get_page_paths(url: str) -> Tuple[str, str]:
+    """Returns the paths a url's page and its metadata (its url, size
+    and storing time) are stored at."""
+    page_path = os.path.join(
+        _get_page_directory(),
+        hashlib.sha1(url.encode("utf8")).hexdigest()
+    )
+
+    return page_path + ".html", page_path + ".meta"
+
+
+def _load_page_metadata(url: str) -> Optional[Dict[str, Any]]:
+    """Loads the metadata of a cached page, or returns None if the
+    page isn't cached."""
+    try:
+        with open(_get_page_paths(url)[1], "r", encoding="utf8") as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    return metadata if metadata["url"] == url else None
+
+
+def _remove_page_files(page_path: str) -> None:
+    """Deletes a cached page's file and its metadata file."""
+    for path in [page_path, page_path[:-len(".html")] + ".meta"]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # already gone, which is what we wanted anyways
+
+
+def is_page_cached(url: str) -> bool:
+    """Checks to see if a page is in the page cache and was stored
+    within the page time-to-live, without marking it as used."""
+    metadata = _load_page_metadata(url)
+
+    return (
+        metadata is not None
+        and time.time() - metadata["stored"]
+        < get_page_cache_settings()["page_ttl"]
+    )
+
+
+def load_cached_page(
+        url: str,
+        allow_expired: bool = False
+) -> Optional[bytes]:
+    """Retrieves the cached copy of a page if it was stored within
+    the page time-to-live (or at all, if allow_expired is specified),
+    and marks it as the most recently used page.
+
+    Returns None if the page isn't cached, or if the cached copy
+    is too old (in which case it is removed).
+    """
+    metadata = _load_page_metadata(url)
+    if metadata is None:
+        return None
+
+    page_path = _get_page_paths(url)[0]
+    page_ttl = get_page_cache_settings()["page_ttl"]
+
+    content = None
+    if allow_expired or time.time() - metadata["stored"] < page_ttl:
+        try:
+            with open(page_path, "rb") as f:
+                content = f.read()
+        except OSError:
+            pass  # the page went missing, so it's treated as expired
+
+    if content is None:
+        _remove_page_files(page_path)
+        return None
+
+    # The page file's modification time is its last use, so marking it
+    # as used doesn't rewrite anything
+    try:
+        os.utime(page_path)
+    except OSError:
+        pass  # removed by another process just now, which is fine
+
+    return content
+
+
+def store_cached_page(url: str, content: bytes) -> None:
+    """Stores a freshly downloaded page as the most recently used
+    page, then removes the least recently used pages until the page
+    cache fits in its size limit again.
+
+    Every page has its own metadata file, so processes storing and
+    removing pages at the same time never lose each other's pages.
+    A page bigger than the whole limit is simply not stored.
+    """
+    max_size = get_page_cache_settings()["page_cache_size"]
+    if len(content) > max_size:
+        return
+
+    page_directory = _get_page_directory()
+    os.makedirs(page_directory, exist_ok=True)
+
+    page_path, metadata_path = _get_page_paths(url)
+
+    # The page goes in before its metadata, so metadata never points
+    # at a page that isn't there yet
+    temporary_path = get_temporary_path(page_path)
+    with open(temporary_path, "wb") as f:
+        f.write(content)
+    os.replace(temporary_path, page_path)
+
+    temporary_path = get_temporary_path(metadata_path)
+    with open(temporary_path, "w", encoding="utf8") as f:
+        json.dump(
+            {"url": url, "size": len(content), "stored": time.time()}, f
+        )
+    os.replace(temporary_path, metadata_path)
+
+    pages = []
+    for cached_path in glob.glob(os.path.join(page_directory, "*.html")):
+        try:
+            stat = os.stat(cached_path)
+        except OSError:
+            continue  # removed by another process just now
+
+        pages.append((stat.st_mtime, stat.st_size, cached_path))
+
+    total_size = sum(size for _, size, _ in pages)
+    for _, size, cached_path in sorted(pages):
+        if total_size <= max_size:
+            break
+
+        _remove_page_files(cached_path)
+        total_size -= size
+
+
+def invalidate_cached_page(url: str) -> bool:
+    """Removes a page from the page cache, so the next request for it
+    downloads it again.
+
+    Returns whether the page was cached in the first place.
+    """
+    if _load_page_metadata(url) is None:
+        return False
+
+    _remove_page_files(_get_page_paths(url)[0])
+
+    return True
+
+
+def describe_age(timestamp: float) -> str:
+    """Describes how long ago a timestamp was in words
+    (eg. "3 hours ago"), and returns it."""
+    age = time.time() - timestamp
+
+    for unit, unit_seconds in [
+            ("day", 86400),
+            ("hour", 3600),
+            ("minute", 60)
+    ]:
+        if age >= unit_seconds:
+            amount = int(age // unit_seconds)
+            return f"{amount} {unit}{'s' if amount != 1 else ''} ago"
+
+    return "less than a minute ago"
+
+
+def _get_rendered_path(key: str) -> str:
+    """Returns the path the rendered output for a key is stored at."""
+    key_hash = hashlib.sha1(key.encode("utf8")).hexdigest()
+
+    return os.path.join(get_cache_directory(), "rendered", key_hash + ".json")
+
+
+def load_rendered_output(key: str, version: str) -> Optional[List[str]]:
+    """Retrieves the stored rendered output (a list of lines) for a key,
+    if it was rendered from the specified version of the data and
+    hasn't expired.
+
+    Returns None if there is no usable output stored.
+    """
+    try:
+        with open(_get_rendered_path(key), "r", encoding="utf8") as f:
+            rendered = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if rendered["key"] != key or rendered["version"] != version:
+        return None
+    if rendered["expires"] is not None and time.time() >= rendered["expires"]:
+        return None
+
+    return rendered["output"]
+
+
+def store_rendered_output(
+        key: str,
+        version: str,
+        output: List[str],
+        lifetime: Optional[float] = None
+) -> None:
+    """Stores the rendered output (a list of lines) for a key, along
+    with the version of the data it was rendered from.
+
+    If a lifetime (in seconds) is specified, the output also expires
+    after that long, for output made from data that isn't versioned.
+    """
+    rendered_path = _get_rendered_path(key)
+    os.makedirs(os.path.dirname(rendered_path), exist_ok=True)
+
+    temporary_path = get_temporary_path(rendered_path)
+
+    with open(temporary_path, "w", encoding="utf8") as f:
+        json.dump({
+            "key": key,
+            "version": version,
+            "expires": None if lifetime is None else time.time() + lifetime,
+            "output": output,
+        }, f)
+    os.replace(temporary_path, rendered_path)
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
@@ -1,30 +1,70 @@
 """A module with functions related to retrieving information from
-local files."""
+local files.
 
+Every info file read with read_lines_into_dict() goes through a small
+table registry, so each file is only parsed once per process. The
+parsed tables are also stored in the cache directory (and thrown away
+whenever the info file is modified), so new processes usually don't
+have to parse the file at all."""
+
+import hashlib
+import json
+import os
 import re
 import sys
+import threading
+from typing import Any, Dict, List, Union
+
+
+# The settings file that says where the cache directory is. Its tables
+# are never stored on disk, since that would need the cache directory
+# to be known before the settings file is read.
+CACHE_SETTINGS_FILE = "./info/cache/cacheSettings.txt"
+
+# Every table parsed in this process, matched by file to a tuple of
+# (the file's modification stamp, every view of the table)
+_table_registry = {}
+
+
+def get_temporary_path(path):
+    """Returns the temporary path a file is written to before it is
+    moved over the real path. Every process and thread gets its own,
+    so that two of them writing the same file never write into each
+    other's."""
+    return f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
 
 
 def read_line_from_file(file):
-    """Reads one line from a file and returns it as string."""
+    """Reads the first line from a file and returns it as string,
+    without its line break."""
     with open(file, "r") as f:
         result = f.readline()
 
-    return result
+    return result.rstrip("\r\n")
 
 
-def read_lines_into_dict(file, reverse=False, overwrite=True):
-    """Reads multiple lines from a file and returns it as a dict.
+def read_all_lines_from_file(file: str) -> List[str]:
+    """Reads every non-empty line from a file and returns them as a
+    list of strings, in order, with any surrounding whitespace
+    stripped."""
+    with open(file, "r") as f:
+        return [line.strip() for line in f if line.strip() != ""]
 
-    If the reversed flag is specified, the dict will be made with the
-    2nd provided argument in the file being the key, as opposed to the
-    1st. This is useful for backwards conversions.
 
-    If the overwrite flag is false, the resulting dictionary will
-    become a dictionary of lists and any repeating key will simply
-    add the value to the list of values.
+def _parse_table_views(file: str) -> Dict[str, Dict[str, Any]]:
+    """Reads multiple lines from a file and builds every view of the
+    table in the file in one pass, returning them in a dict.
+
+    The views are `forward` and `reverse` (where later lines overwrite
+    earlier ones), as well as `forward_multi` and `reverse_multi`
+    (where every value for a key is kept in a list).
     """
-    new_dict = {}
+    views = {
+        "forward": {},
+        "reverse": {},
+        "forward_multi": {},
+        "reverse_multi": {},
+    }
 
     with open(file, "r", encoding="utf8") as f:
         current_line = f.readline()
@@ -32,29 +72,118 @@ def read_lines_into_dict(file, reverse=False, overwrite=True):
         while current_line != "\n" and current_line != "":
             line_info = re.split(r"\s+", current_line.rstrip())
 
-            line_info[0] = line_info[0].replace("+", " ")
-            line_info[1] = line_info[1].replace("+", " ")
-
-            # Determine how to add the data to the dictionary
-            if overwrite:
-                if not reverse:
-                    new_dict[line_info[0]] = line_info[1]
-                else:
-                    new_dict[line_info[1]] = line_info[0]
-            else:
-                if not reverse:
-                    if line_info[0] not in new_dict.keys():
-                        new_dict[line_info[0]] = [line_info[1]]
-                    else:
-                        new_dict[line_info[0]].append(line_info[1])
-                else:
-                    if line_info[1] not in new_dict.keys():
-                        new_dict[line_info[1]] = [line_info[0]]
-                    else:
-                        new_dict[line_info[1]].append(line_info[0])
+            first = line_info[0].replace("+", " ")
+            second = line_info[1].replace("+", " ")
+
+            views["forward"][first] = second
+            views["reverse"][second] = first
+            views["forward_multi"].setdefault(first, []).append(second)
+            views["reverse_multi"].setdefault(second, []).append(first)
 
             current_line = f.readline()
-    return new_dict
+
+    return views
+
+
+def _get_compiled_table_path(file: str) -> str:
+    """Returns the path the compiled tables of a file are stored at."""
+    file_hash = hashlib.sha1(
+        os.path.abspath(file).encode("utf8")
+    ).hexdigest()
+
+    return os.path.join(
+        read_lines_into_dict(CACHE_SETTINGS_FILE)["directory"],
+        "tables",
+        file_hash + ".json"
+    )
+
+
+def _load_table_views(
+        file: str,
+        stamp: List[int]
+) -> Dict[str, Dict[str, Any]]:
+    """Loads every view of the table in a file, from the compiled copy
+    stored on disk if the file hasn't been modified since it was
+    compiled, or by parsing the file (and storing it) otherwise."""
+    if file == CACHE_SETTINGS_FILE:
+        return _parse_table_views(file)
+
+    compiled_path = _get_compiled_table_path(file)
+
+    try:
+        with open(compiled_path, "r", encoding="utf8") as f:
+            compiled_table = json.load(f)
+
+        if compiled_table["stamp"] == stamp:
+            return compiled_table["views"]
+    except (OSError, ValueError, KeyError):
+        pass  # Missing or broken compiled table, so we just parse it
+
+    views = _parse_table_views(file)
+
+    # A cache that can't be written to just means parsing again
+    # next time, which is fine
+    try:
+        temporary_path = get_temporary_path(compiled_path)
+        os.makedirs(os.path.dirname(compiled_path), exist_ok=True)
+        with open(temporary_path, "w", encoding="utf8") as f:
+            json.dump({"stamp": stamp, "views": views}, f)
+        os.replace(temporary_path, compiled_path)
+    except OSError:
+        pass
+
+    return views
+
+
+def get_table_views(file: str) -> Dict[str, Dict[str, Any]]:
+    """Retrieves every view of the table in a file (see
+    _parse_table_views()) through the table registry, and returns them.
+
+    The views are shared by the whole process, so they must not be
+    changed. Use read_lines_into_dict() for a copy that can be.
+    """
+    file_stat = os.stat(file)
+    stamp = [file_stat.st_mtime_ns, file_stat.st_size]
+
+    if file in _table_registry.keys():
+        registered_stamp, views = _table_registry[file]
+
+        if registered_stamp == stamp:
+            return views
+
+    views = _load_table_views(file, stamp)
+    _table_registry[file] = (stamp, views)
+
+    return views
+
+
+def read_lines_into_dict(
+        file, reverse=False, overwrite=True
+) -> Dict[str, Union[str, List[str]]]:
+    """Reads multiple lines from a file and returns it as a dict.
+
+    If the reversed flag is specified, the dict will be made with the
+    2nd provided argument in the file being the key, as opposed to the
+    1st. This is useful for backwards conversions.
+
+    If the overwrite flag is false, the resulting dictionary will
+    become a dictionary of lists and any repeating key will simply
+    add the value to the list of values.
+
+    The file is only parsed the first time it is asked for (see
+    get_table_views()), and a fresh copy is returned every time, so
+    the returned dict can be changed freely.
+    """
+    views = get_table_views(file)
+
+    if overwrite:
+        return dict(views["reverse" if reverse else "forward"])
+
+    return {
+        key: list(values)
+        for key, values
+        in views["reverse_multi" if reverse else "forward_multi"].items()
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,319 @@
+"""A module that contains functions for walking through a JSON
+document incrementally, so that one entry can be found in a huge JSON
+without decoding (or even holding) the whole thing."""
+
+import codecs
+import json
+import re
+import sys
+from typing import (
+    Any, Collection, Dict, Iterable, Iterator, Optional, Tuple, Union
+)
+
+
+# Skips over everything (including whole strings) up to the next
+# bracket that isn't inside a string, so that strings never have to be
+# walked through in Python
+_NEXT_BRACKET = re.compile(
+    r'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*([{}\[\]])',
+    re.DOTALL
+)
+# The rest of a string, starting right after its opening quote
+_STRING_REST = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+# The end of a number, true, false or null
+_SCALAR_END = re.compile(r'[,}\]\s]')
+_WHITESPACE = re.compile(r'\s*')
+
+
+class _JsonScanner:
+    """A small helper that reads a JSON document chunk by chunk,
+    keeping only the text that hasn't been walked past yet.
+
+    This isn't a full JSON parser; it only knows enough about JSON to
+    find where each value starts and ends. Values are only decoded
+    (with the json module) when they're actually wanted.
+    """
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]]) -> None:
+        """Initializes a scanner over an iterable of chunks, which can
+        either be bytes (decoded as utf8) or strings."""
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._buffer = ""
+        self._pos = 0
+        # The start of the value currently being read, which has to
+        # be kept in the buffer until the whole value is read
+        self._mark = None
+
+    def _read_more(self, count: int = 1) -> bool:
+        """Adds the next chunk (or the next `count` chunks) to the
+        buffer, throwing away everything before the current position
+        (or the current value's start). Returns False if there are no
+        chunks left."""
+        new_text = []
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._decoder.decode(chunk)
+
+            new_text.append(chunk)
+            if len(new_text) == count:
+                break
+
+        if len(new_text) == 0:
+            return False
+
+        keep_from = (
+            self._pos if self._mark is None
+            else min(self._pos, self._mark)
+        )
+        self._buffer = self._buffer[keep_from:] + "".join(new_text)
+        self._pos -= keep_from
+        if self._mark is not None:
+            self._mark -= keep_from
+
+        return True
+
+    def peek(self) -> str:
+        """Skips any whitespace and returns the next character without
+        consuming it, or an empty string if the document ended."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read_more():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """Consumes the next character, which has to be one of
+        `chars`, and returns it."""
+        char = self.peek()
+        if char == "" or char not in chars:
+            raise ValueError(
+                f"Expected one of '{chars}' but found '{char}' in JSON."
+            )
+
+        self._pos += 1
+        return char
+
+    def _skip_string(self) -> None:
+        """Moves the position past the string that starts (with its
+        opening quote) at the current position."""
+        while True:
+            match = _STRING_REST.match(self._buffer, self._pos + 1)
+            if match is not None:
+                self._pos = match.end()
+                return
+
+            if not self._read_more():
+                raise ValueError("Unterminated string in JSON.")
+
+    def read_value(self, decoder: json.JSONDecoder) -> Any:
+        """Consumes the next value and returns it, decoded with the
+        specified decoder.
+
+        If the value doesn't fit in the buffer yet, more chunks are
+        read and the value is decoded again, reading twice as many
+        chunks every time so that even a huge value is only decoded
+        a few times.
+        """
+        char = self.peek()
+        count = 1
+
+        # A number (or true, false or null) could go on in the next
+        # chunk, and the json module would happily decode just the
+        # part that's in the buffer (eg. "3058." as 3058), so it's only
+        # decoded once whatever ends it is in the buffer too
+        if char != "" and char not in '"{[':
+            while _SCALAR_END.search(self._buffer, self._pos) is None:
+                if not self._read_more():
+                    break
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._read_more(count):
+                    raise
+                count *= 2
+                continue  # whoa a bad continue
+
+            self._pos = end
+            return value
+
+    def read_raw_value(self) -> str:
+        """Consumes the next value and returns its text, without
+        decoding it."""
+        char = self.peek()
+        self._mark = self._pos
+
+        if char == '"':
+            self._skip_string()
+
+        elif char in "{[":
+            depth = 0
+            while depth > 0 or self._pos == self._mark:
+                match = _NEXT_BRACKET.match(self._buffer, self._pos)
+
+                # The next bracket isn't in the buffer yet (or a
+                # string got cut off between chunks)
+                if match is None:
+                    if not self._read_more():
+                        raise ValueError("Unterminated value in JSON.")
+                    continue
+
+                self._pos = match.end()
+                depth += 1 if match.group(1) in "{[" else -1
+
+        else:
+            while True:
+                match = _SCALAR_END.search(self._buffer, self._pos)
+                if match is not None:
+                    self._pos = match.start()
+                    break
+
+                self._pos = len(self._buffer)
+                if not self._read_more():
+                    break
+
+        raw_value = self._buffer[self._mark:self._pos]
+        self._mark = None
+
+        return raw_value
+
+
+def iter_json_items(
+        chunks: Iterable[Union[bytes, str]]
+) -> Iterator[Tuple[Union[str, int], str]]:
+    """Walks through the top level of a JSON object (or array) one
+    entry at a time, and yields each entry as a tuple of
+    (key, raw text of the value). For an array, the key is the
+    entry's index.
+
+    Values are never decoded here, so `json.loads()` has to be called
+    on whichever values are actually needed. Only one value's text is
+    held at a time.
+    """
+    scanner = _JsonScanner(chunks)
+    opening = scanner.expect("{[")
+    closing = "}" if opening == "{" else "]"
+
+    if scanner.peek() == closing:
+        return
+
+    index = 0
+    while True:
+        if opening == "{":
+            key = json.loads(scanner.read_raw_value())
+            scanner.expect(":")
+        else:
+            key = index
+            index += 1
+
+        yield key, scanner.read_raw_value()
+
+        if scanner.expect("," + closing) == closing:
+            return
+
+
+def load_json(chunks: Iterable[Union[bytes, str]]) -> Any:
+    """Decodes a whole JSON document (an object or array) one
+    top-level entry at a time, and returns it.
+
+    The result is the same as `json.loads()` on the whole document,
+    but only about one entry's text is held at a time, instead of the
+    whole document's bytes and text alongside the decoded result.
+    """
+    # Every entry is decoded on its own, so equal keys are shared
+    # between entries here (like json.loads() does for one document)
+    keys = {}
+    decoder = json.JSONDecoder(
+        object_pairs_hook=lambda pairs: {
+            keys.setdefault(key, key): value for key, value in pairs
+        }
+    )
+
+    scanner = _JsonScanner(chunks)
+    opening = scanner.expect("{[")
+    closing = "}" if opening == "{" else "]"
+    result = {} if opening == "{" else []
+
+    if scanner.peek() == closing:
+        return result
+
+    while True:
+        if opening == "{":
+            key = scanner.read_value(decoder)
+            scanner.expect(":")
+            result[key] = scanner.read_value(decoder)
+        else:
+            result.append(scanner.read_value(decoder))
+
+        if scanner.expect("," + closing) == closing:
+            return result
+
+
+def find_raw_json_items(
+        chunks: Iterable[Union[bytes, str]],
+        keys: Collection[Union[str, int]]
+) -> Dict[Union[str, int], str]:
+    """Finds the entries with the specified keys in the top level of
+    a JSON object (or array), and returns the raw (undecoded) text of
+    each one in a dict.
+
+    The walk stops as soon as every key has been found, so nothing
+    after the last wanted entry is even read. Keys that aren't in the
+    JSON are simply missing from the returned dict.
+
+    Since the raw text is itself a JSON document, it can be searched
+    again (eg. `find_json_items([raw_text], keys)`) to reach entries
+    nested deeper without decoding the whole entry.
+    """
+    wanted = set(keys)
+    found = {}
+
+    if len(wanted) == 0:
+        return found
+
+    for key, raw_value in iter_json_items(chunks):
+        if key in wanted:
+            found[key] = raw_value
+
+            if len(found) == len(wanted):
+                break  # whoa a bad break
+
+    return found
+
+
+def find_json_items(
+        chunks: Iterable[Union[bytes, str]],
+        keys: Collection[Union[str, int]]
+) -> Dict[Union[str, int], Any]:
+    """Finds the entries with the specified keys in the top level of
+    a JSON object (or array), decodes only those entries, and returns
+    them as a dict.
+
+    See find_raw_json_items().
+    """
+    return {
+        key: json.loads(raw_value)
+        for key, raw_value in find_raw_json_items(chunks, keys).items()
+    }
+
+
+def find_json_item(
+        chunks: Iterable[Union[bytes, str]],
+        key: Union[str, int]
+) -> Optional[Any]:
+    """Finds a single entry in the top level of a JSON object (or
+    array) and returns it decoded, or None if it isn't there.
+
+    See find_json_items().
+    """
+    return find_json_items(chunks, [key]).get(key)
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
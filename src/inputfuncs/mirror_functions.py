@@ -0,0 +1,169 @@
+"""A module that contains functions related to choosing which mirror
+a JSON is downloaded from.
+
+Every `*JsonUrl.txt` file in the info directory can list more than one
+url for its JSON, one per line. The first url is the JSON's real url
+(everything is cached under it), and every url after it is a mirror
+that serves the same file. How fast each mirror answers and how often
+it fails is recorded in the cache directory, so later runs try the
+fastest healthy mirror first."""
+
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+from inputfuncs.input_reader import (
+    get_temporary_path,
+    read_all_lines_from_file,
+    read_lines_into_dict
+)
+from inputfuncs.cache_functions import get_cache_directory
+
+# How much a new latency counts towards a mirror's recorded latency
+# (the rest comes from the old recorded latency)
+LATENCY_WEIGHT = 0.3
+
+# Every mirror list, matched by each list's first url, read the first
+# time a mirror list is needed
+_mirror_lists = None
+
+# Mirror scores are read and rewritten as a whole, so only one thread
+# at a time gets to do that
+_score_lock = threading.Lock()
+
+
+def get_mirror_lists() -> Dict[str, List[str]]:
+    """Reads every JSON url file in the info directory and returns
+    the urls in each, matched by the first url in the file."""
+    global _mirror_lists
+
+    if _mirror_lists is None:
+        _mirror_lists = {}
+
+        for url_file in sorted(glob.glob("./info/*/*JsonUrl.txt")):
+            urls = read_all_lines_from_file(url_file)
+            if len(urls) > 0:
+                _mirror_lists[urls[0]] = urls
+
+    return _mirror_lists
+
+
+def get_mirrors(url: str) -> List[str]:
+    """Retrieves every url that serves the same file as the specified
+    url (including the url itself, which comes first). Urls without
+    mirrors just give a list with only themselves."""
+    return get_mirror_lists().get(url, [url])
+
+
+def _get_score_path() -> str:
+    """Returns the path the mirror scores are stored at."""
+    return os.path.join(get_cache_directory(), "mirrors.json")
+
+
+def _load_scores() -> Dict[str, Dict[str, Any]]:
+    """Loads every mirror's recorded latency and failures, matched by
+    the mirror's url."""
+    try:
+        with open(_get_score_path(), "r", encoding="utf8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_scores(scores: Dict[str, Dict[str, Any]]) -> None:
+    """Writes every mirror's recorded latency and failures to disk."""
+    score_path = _get_score_path()
+    temporary_path = get_temporary_path(score_path)
+
+    os.makedirs(os.path.dirname(score_path), exist_ok=True)
+    with open(temporary_path, "w", encoding="utf8") as f:
+        json.dump(scores, f)
+    os.replace(temporary_path, score_path)
+
+
+def _is_healthy(score: Dict[str, Any], cooldown: float) -> bool:
+    """Checks to see if a mirror hasn't failed recently. Every failure
+    in a row doubles how long a mirror is avoided for."""
+    if score["failures"] == 0:
+        return True
+
+    return (
+        time.time() - score["failed"]
+        >= cooldown * 2 ** (score["failures"] - 1)
+    )
+
+
+def rank_mirrors(url: str) -> List[str]:
+    """Retrieves every mirror of a url (see get_mirrors()) in the order
+    they should be tried in, and returns them.
+
+    Healthy mirrors come first, fastest first. A mirror that was never
+    tried counts as the fastest, so that every mirror gets measured.
+    Mirrors that failed recently come last, the one that failed the
+    longest ago first.
+    """
+    mirrors = get_mirrors(url)
+    if len(mirrors) == 1:
+        return mirrors
+
+    cooldown = float(read_lines_into_dict(
+        "./info/scraper/requestSettings.txt"
+    )["mirror_cooldown"])
+    with _score_lock:
+        scores = _load_scores()
+
+    def rank(mirror):
+        score = scores.get(mirror)
+        if score is None:
+            return (0, 0.0)
+        if _is_healthy(score, cooldown):
+            return (0, score["latency"] or 0.0)
+
+        return (1, score["failed"])
+
+    # sorted() keeps the file's order for mirrors that rank the same
+    return sorted(mirrors, key=rank)
+
+
+def record_mirror_success(mirror: str, latency: float) -> None:
+    """Records that a mirror answered in the specified number of
+    seconds, and clears its failures."""
+    with _score_lock:
+        scores = _load_scores()
+        old_latency = scores.get(mirror, {}).get("latency")
+
+        scores[mirror] = {
+            "latency": (
+                latency if old_latency is None
+                else LATENCY_WEIGHT * latency
+                + (1 - LATENCY_WEIGHT) * old_latency
+            ),
+            "failures": 0,
+            "failed": None,
+        }
+        _write_scores(scores)
+
+
+def record_mirror_failure(mirror: str) -> None:
+    """Records that a mirror failed, timed out or gave an error, so it
+    is avoided for a while."""
+    with _score_lock:
+        scores = _load_scores()
+        score = scores.get(mirror, {"latency": None, "failures": 0})
+
+        scores[mirror] = {
+            "latency": score["latency"],
+            "failures": score["failures"] + 1,
+            "failed": time.time(),
+        }
+        _write_scores(scores)
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
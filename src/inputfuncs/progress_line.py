@@ -0,0 +1,114 @@
+"""A module that contains the ProgressLine class, a single line at the
+bottom of the screen that shows how many of a batch of jobs are done.
+
+Unlike a Halo spinner, a ProgressLine doesn't animate on its own
+thread, and every update to it goes through one lock, so any number of
+worker threads can report to the same line while the main thread
+prints finished results above it."""
+
+import sys
+import threading
+from typing import TextIO
+
+
+class ProgressLine:
+    """A thread-safe progress line, showing how many of a known number
+    of jobs have finished (eg. "Looking up (3/30)...").
+
+    The line is only drawn if the stream is a terminal, so output that
+    is piped or redirected stays clean.
+
+    Public variables:
+
+    total -- int,
+
+    done -- int
+
+    Public methods:
+
+    start()
+
+    advance()
+
+    write(text)
+
+    finish()
+
+    """
+
+    def __init__(
+            self,
+            text: str,
+            total: int,
+            stream: TextIO = sys.stdout
+    ) -> None:
+        """Initializes a ProgressLine object. Nothing is drawn until
+        start() is called.
+
+        Keyword arguments:
+
+        text -- string, what is being done (eg. "Looking up")
+
+        total -- int, the number of jobs in the batch
+
+        stream -- TextIO, the stream to draw on (default sys.stdout)
+        """
+        self.total = total
+        self.done = 0
+        self._text = text
+        self._stream = stream
+        self._lock = threading.Lock()
+        self._drawn = False
+        self._enabled = stream.isatty()
+
+    def _draw(self) -> None:
+        """Draws the line over whatever the cursor's line holds. Must
+        be called with the lock held."""
+        if not self._enabled:
+            return
+
+        self._stream.write(
+            f"\r\033[K{self._text} ({self.done}/{self.total})..."
+        )
+        self._stream.flush()
+        self._drawn = True
+
+    def _clear(self) -> None:
+        """Erases the line, if it is drawn. Must be called with the
+        lock held."""
+        if self._drawn:
+            self._stream.write("\r\033[K")
+            self._drawn = False
+
+    def start(self) -> None:
+        """Draws the line for the first time."""
+        with self._lock:
+            self._draw()
+
+    def advance(self) -> None:
+        """Records that one more job finished, and redraws the line.
+        Safe to call from any thread."""
+        with self._lock:
+            self.done += 1
+            self._draw()
+
+    def write(self, text: str) -> None:
+        """Writes text above the line, then draws the line again
+        under it."""
+        with self._lock:
+            self._clear()
+            self._stream.write(text)
+            self._draw()
+
+    def finish(self) -> None:
+        """Erases the line for good."""
+        with self._lock:
+            self._clear()
+            self._stream.flush()
+            self._enabled = False
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
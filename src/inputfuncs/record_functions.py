@@ -0,0 +1,105 @@
+"""A module that contains functions related to recording every
+response this program uses, so that a run can be played back later
+without the network.
+
+Recordings are laid out by url path (eg.
+`https://gamepress.gg/arknights/operator/amiya` is recorded at
+`<directory>/arknights/operator/amiya`), so any plain HTTP server
+serving the recording directory (like `ark.py serve`) answers at the
+same paths as the real servers. The url override (see
+scraper_functions.set_url_override()) then points every request at
+that server."""
+
+import os
+import posixpath
+import sys
+import threading
+from typing import Iterable, Optional, Union
+from urllib.parse import urlsplit
+
+from inputfuncs.input_reader import get_temporary_path
+from inputfuncs.cache_functions import iter_cached_body
+
+# The directory recordings go in when none is given
+DEFAULT_RECORD_DIRECTORY = "./recordings"
+
+# Set through set_record_directory() when --record is given on the
+# command line
+_record_directory = None
+
+# The hash of every cached body recorded during this run, matched by
+# its url
+_recorded_bodies = {}
+_recorded_lock = threading.Lock()
+
+
+def set_record_directory(directory: Optional[str]) -> None:
+    """Turns record mode on for the rest of this run, recording every
+    response into the specified directory (or turns it off, if the
+    directory is None)."""
+    global _record_directory
+    _record_directory = directory
+    _recorded_bodies.clear()
+
+
+def is_recording() -> bool:
+    """Checks to see if record mode is turned on."""
+    return _record_directory is not None
+
+
+def get_record_path(url: str, directory: str) -> str:
+    """Returns the path a url's response is recorded at in the
+    specified directory.
+
+    Query strings are left out, since plain HTTP servers ignore them
+    when finding a file. A path ending in a slash is recorded as its
+    directory's `index.html`.
+    """
+    path = posixpath.normpath("/" + urlsplit(url).path)
+    if urlsplit(url).path.endswith("/"):
+        path = posixpath.join(path, "index.html")
+
+    return os.path.join(directory, *path.strip("/").split("/"))
+
+
+def record_response(url: str, content: Union[bytes, Iterable[bytes]]) -> None:
+    """Records a response body (given whole, or as an iterable of
+    chunks) for a url, if record mode is on. Nothing is returned."""
+    if _record_directory is None:
+        return
+
+    record_path = get_record_path(url, _record_directory)
+    temporary_path = get_temporary_path(record_path)
+
+    if isinstance(content, bytes):
+        content = [content]
+
+    os.makedirs(os.path.dirname(record_path), exist_ok=True)
+    with open(temporary_path, "wb") as f:
+        for chunk in content:
+            f.write(chunk)
+    os.replace(temporary_path, record_path)
+
+
+def record_cached_response(url: str, body_hash: str) -> None:
+    """Records the body a url has in the disk cache, if record mode is
+    on. Nothing is returned.
+
+    The same JSON is asked for many times in one run, so a body (told
+    apart by its hash) that was already recorded isn't written again.
+    """
+    if _record_directory is None:
+        return
+
+    with _recorded_lock:
+        if _recorded_bodies.get(url) == body_hash:
+            return
+        _recorded_bodies[url] = body_hash
+
+    record_response(url, iter_cached_body(url))
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
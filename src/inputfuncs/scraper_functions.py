@@ -1,36 +1,365 @@
 """A module that contains functions related to retrieving information
-from a web source, instead of a file."""
+from a web source, instead of a file.
 
+Every request goes through one pooled session, so connections to the
+same server are kept alive and reused, and failed requests are retried
+with an exponential backoff (and on another mirror, for JSONs that have
+mirrors). Identical requests made at the same time (eg. from several
+threads) are coalesced, so only one of them is actually sent."""
+
+import os
+import random
 import sys
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
 from inputfuncs.input_reader import (
     read_line_from_file,
     read_lines_into_dict
 )
+from inputfuncs.cache_functions import (
+    CachedResponse,
+    load_cache_entry,
+    is_cache_entry_fresh,
+    build_revalidation_headers,
+    store_cache_entry,
+    mark_cache_entry_checked,
+    load_cached_page,
+    store_cached_page,
+    invalidate_cached_page
+)
+from inputfuncs.record_functions import (
+    record_response,
+    record_cached_response
+)
+from inputfuncs.mirror_functions import (
+    rank_mirrors,
+    record_mirror_success,
+    record_mirror_failure
+)
+
+
+# Set through set_offline_mode() when --offline is given on the
+# command line
+_offline = False
+
+# Set through set_url_override() when --url-override is given on the
+# command line
+_url_override = None
+
+# Set through set_request_settings() when request settings are given on
+# the command line
+_request_setting_overrides = {}
+
+# The environment variables that can override each request setting
+REQUEST_SETTING_VARIABLES = {
+    "connect_timeout": "ARK_HTTP_CONNECT_TIMEOUT",
+    "read_timeout": "ARK_HTTP_TIMEOUT",
+    "retries": "ARK_HTTP_RETRIES",
+    "backoff": "ARK_HTTP_BACKOFF",
+}
+
+# The type every request setting is read as
+REQUEST_SETTING_TYPES = {
+    "connect_timeout": float,
+    "read_timeout": float,
+    "retries": int,
+    "backoff": float,
+    "pool_size": int,
+}
+
+# How many bytes of a downloaded JSON are held at once
+STREAM_CHUNK_SIZE = 65536
+
+# Server responses that are worth trying again after a while
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# The shared session, created the first time a request is sent
+_session = None
+_session_lock = threading.Lock()
+
+# Every JSON url that was already checked with the server during this
+# run, so that it isn't checked again no matter what the ttl is
+_checked_urls = set()
+
+# Every call currently running through single_flight(), matched by its
+# key to the Future its result will be put in
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def single_flight(key, function, *args):
+    """Calls a function with the specified arguments and returns its
+    result, unless a call with the same key is already running in
+    another thread. In that case, nothing is called, and that call's
+    result is waited for and returned instead (or its exception is
+    raised).
+
+    This keeps identical requests made at the same time from being
+    sent more than once.
+    """
+    with _in_flight_lock:
+        flight = _in_flight.get(key)
+        is_leader = flight is None
+        if is_leader:
+            flight = Future()
+            _in_flight[key] = flight
+
+    if not is_leader:
+        return flight.result()
+
+    try:
+        result = function(*args)
+    except BaseException as error:
+        flight.set_exception(error)
+        raise
+    else:
+        flight.set_result(result)
+        return result
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+
+
+def set_offline_mode(offline):
+    """Turns offline mode on or off for the rest of this run. In
+    offline mode, no request is ever sent, and only what is already
+    stored on disk is used."""
+    global _offline
+    _offline = offline
+
+
+def is_offline_mode():
+    """Checks to see if offline mode is turned on."""
+    return _offline
+
+
+def set_url_override(base_url):
+    """Overrides the server every request is sent to for the rest of
+    this run (see get_url_override()). Nothing is changed if the base
+    url is None."""
+    global _url_override
+    if base_url is not None:
+        _url_override = base_url
+
+
+def get_url_override():
+    """Retrieves the base url (eg. `http://127.0.0.1:8777`) that every
+    request is sent to instead of the server in its url, keeping the
+    url's path and query.
+
+    The override comes from the command line if it was given there,
+    then from the ARK_URL_OVERRIDE environment variable. Returns None
+    if there is no override.
+    """
+    if _url_override is not None:
+        return _url_override
+
+    return os.environ.get("ARK_URL_OVERRIDE") or None
+
+
+def apply_url_override(url):
+    """Returns the url a request for the specified url is actually
+    sent to (see get_url_override()).
+
+    Only the url sent over the network changes, so responses are
+    still cached under the original url.
+    """
+    base_url = get_url_override()
+    if base_url is None:
+        return url
+
+    split_url = urlsplit(url)
+
+    return (
+        base_url.rstrip("/")
+        + split_url.path
+        + ("?" + split_url.query if split_url.query != "" else "")
+    )
+
+
+def set_request_settings(**settings):
+    """Overrides request settings (connect_timeout, read_timeout,
+    retries, backoff) for the rest of this run. Settings that are
+    None are left alone."""
+    _request_setting_overrides.update({
+        name: value
+        for name, value in settings.items()
+        if value is not None
+    })
+
+
+def get_request_settings():
+    """Retrieves every request setting as a dict.
+
+    Each setting comes from the command line if it was given there,
+    then from its environment variable (see REQUEST_SETTING_VARIABLES),
+    and from `info/scraper/requestSettings.txt` otherwise.
+    """
+    file_settings = read_lines_into_dict(
+        "./info/scraper/requestSettings.txt"
+    )
+    settings = {
+        name: setting_type(file_settings[name])
+        for name, setting_type in REQUEST_SETTING_TYPES.items()
+    }
+
+    for name, variable in REQUEST_SETTING_VARIABLES.items():
+        if variable in os.environ.keys():
+            try:
+                settings[name] = REQUEST_SETTING_TYPES[name](
+                    os.environ[variable]
+                )
+            except ValueError:
+                # A bad environment variable shouldn't stop every
+                # request, so the setting from the file is kept
+                pass
+
+    settings.update(_request_setting_overrides)
+
+    # With fewer than 0 retries, a request would never be sent at all
+    settings["retries"] = max(settings["retries"], 0)
+    settings["backoff"] = max(settings["backoff"], 0.0)
+
+    return settings
+
+
+def get_session():
+    """Retrieves the shared session every request is sent with,
+    creating it first if needed.
+
+    The session keeps a pool of connections alive for each server and
+    asks for compressed responses.
+    """
+    global _session
+
+    # Requests can be sent from more than one thread at once, and they
+    # should all end up sharing the same session
+    with _session_lock:
+        if _session is None:
+            pool_size = get_request_settings()["pool_size"]
+
+            _session = requests.Session()
+            _session.headers["Accept-Encoding"] = "gzip, deflate"
+            adapter = HTTPAdapter(
+                pool_connections=pool_size,
+                pool_maxsize=pool_size
+            )
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+
+    return _session
+
+
+def send_request(url, headers=None, stream=False):
+    """Sends a GET request through the shared session and returns the
+    Response object, whatever its status code. If stream is specified,
+    the body is left to be read through the Response's iter_content().
+
+    Requests that fail, time out, or get a response that says to try
+    again later (see RETRY_STATUS_CODES) are retried, waiting a random
+    amount of time up to `backoff * 2 ** attempt` seconds in between
+    so that many clients don't all retry at once.
+
+    If the url has mirrors (see mirror_functions.get_mirrors()), each
+    attempt goes through the mirrors from best to worst (see
+    mirror_functions.rank_mirrors()) until one answers without an
+    error, and how each mirror did is recorded for next time.
+
+    Raises a requests.RequestException if every attempt failed.
+    """
+    settings = get_request_settings()
+    timeout = (settings["connect_timeout"], settings["read_timeout"])
+
+    mirrors = rank_mirrors(url)
+    mirrored = len(mirrors) > 1
+    result = None
+    error = None
+
+    for attempt in range(settings["retries"] + 1):
+        if attempt > 0:
+            time.sleep(
+                random.uniform(0, settings["backoff"] * 2 ** (attempt - 1))
+            )
+
+        for mirror in mirrors:
+            # A response that wasn't good enough is dropped, which
+            # hands its connection back to the pool (a streamed body
+            # would hold on to it otherwise)
+            if result is not None:
+                result.close()
+
+            try:
+                result = get_session().get(
+                    apply_url_override(mirror),
+                    headers=headers,
+                    timeout=timeout,
+                    stream=stream
+                )
+                error = None
+            except requests.RequestException as request_error:
+                result = None
+                error = request_error
+
+            # Any error from a mirror means another mirror is worth
+            # a try, since they should all have the file
+            if error is not None \
+                    or result.status_code in RETRY_STATUS_CODES \
+                    or (mirrored and result.status_code >= 400):
+                if mirrored:
+                    record_mirror_failure(mirror)
+                continue  # oh no a bad continue
+
+            if mirrored:
+                record_mirror_success(
+                    mirror, result.elapsed.total_seconds()
+                )
+            return result
+
+    if error is not None:
+        raise error
+
+    return result
 
 
 def scrape_website(url):
-    """Sends a GET request to a certain url and returns the Response
-    object if status code is 200.
+    """Sends a GET request to a certain url (see send_request()) and
+    returns the Response object if status code is 200.
 
-    Returns None if the server responds with a different code.
+    If the same url is already being requested by another thread, that
+    request's Response object is returned instead (see single_flight()).
+    In record mode, the response is recorded (see record_functions).
+
+    Returns None if the server responds with a different code, if
+    the request fails or times out, or if offline mode is on.
     """
-    result = requests.get(url)
+    if _offline:
+        return None
+
+    return single_flight("page " + url, _scrape_website, url)
+
+
+def _scrape_website(url):
+    """Sends the request for scrape_website()."""
+    try:
+        result = send_request(url)
+    except requests.RequestException:
+        return None
 
     # if (True): # debugging
     if result.status_code == 200:
+        record_response(url, result.content)
         return result
 
     return None
 
 
-def scrape_for_operator(operator):
-    """Sends a GET request for a certain operator and returns the
-    Response object if status code is 200.
-
-    Returns None (as per scrape_website() implementation) if server
-    responds with a different code.
-    """
+def get_operator_url(operator):
+    """Returns the url of a certain operator's Gamepress page."""
     url_replacement_names = read_lines_into_dict(
         "./info/scraper/urlOperatorReplacements.txt")
 
@@ -42,18 +371,150 @@ def scrape_for_operator(operator):
         + url_replacement_names[operator]
     )
 
-    return scrape_website(operator_url)
+    return operator_url
 
 
-def scrape_json(json_url):
-    """Sends a GET request to a JSON url for a certain operator and
-    returns the Response object if status code is 200.
+def scrape_for_operator(operator):
+    """Sends a GET request for a certain operator and returns the
+    Response object if status code is 200.
+
+    Pages are kept in the page cache (see
+    cache_functions.store_cached_page()), so an operator that was
+    looked up recently is loaded from disk instead, as a Response-like
+    object. In offline mode, cached pages are used no matter how old
+    they are. Cached pages are recorded in record mode as well.
 
     Returns None (as per scrape_website() implementation) if server
     responds with a different code.
     """
+    operator_url = get_operator_url(operator)
+
+    cached_page = load_cached_page(operator_url, allow_expired=_offline)
+    if cached_page is not None:
+        record_response(operator_url, cached_page)
+        return CachedResponse(operator_url, cached_page)
+
+    result = scrape_website(operator_url)
+    if result is not None:
+        store_cached_page(operator_url, result.content)
+
+    return result
+
+
+def forget_operator_page(operator):
+    """Removes a certain operator's page from the page cache, so the
+    next lookup downloads it again.
+
+    Returns whether the page was cached in the first place.
+    """
+    return invalidate_cached_page(get_operator_url(operator))
+
+
+def fetch_json_entry(json_url, revalidate=False):
+    """Makes sure the disk cache holds an up to date copy of a JSON
+    url, and returns that copy's cache entry (its metadata, including
+    a hash of the body) without reading the body itself.
+
+    The JSONs are huge and rarely change, so every downloaded JSON is
+    kept in the disk cache. If the cached copy was checked within the
+    cache's time-to-live (or earlier in this run), no request is sent
+    at all. Otherwise, the request asks the server to only send the
+    file if it changed, and a `304 Not Modified` reply means the
+    cached copy is kept.
+
+    If revalidate is specified, the server is always asked (with the
+    same conditional request), however recently the cached copy was
+    checked.
+
+    If the request fails or times out, if the server responds with
+    any code other than 200 or 304, or if offline mode is on, the
+    cached copy is used no matter how old it is.
+
+    The body is written to the disk cache as it is downloaded, so the
+    whole body is never held at once.
+
+    If the same url is already being fetched by another thread, that
+    fetch's entry is returned instead (see single_flight()). In record
+    mode, the JSON is recorded (see record_functions) either way.
+
+    Returns None if the JSON couldn't be downloaded and there is no
+    cached copy to fall back on.
+    """
+    # A fetch that has to ask the server can't just take the result of
+    # one that might not have
+    entry = single_flight(
+        ("revalidate " if revalidate else "json ") + json_url,
+        _fetch_json_entry,
+        json_url,
+        revalidate
+    )
+
+    # Cached JSONs are recorded too, so a recording always has every
+    # JSON the run used
+    if entry is not None:
+        record_cached_response(json_url, entry["sha256"])
+
+    return entry
+
+
+def _fetch_json_entry(json_url, revalidate):
+    """Fetches the JSON url for fetch_json_entry()."""
+    entry = load_cache_entry(json_url)
+    if entry is not None and not revalidate and (
+            json_url in _checked_urls or is_cache_entry_fresh(entry)
+    ):
+        return entry
+
+    if _offline:
+        return entry
+
+    try:
+        result = send_request(
+            json_url,
+            headers=build_revalidation_headers(entry),
+            stream=True
+        )
+    except requests.RequestException:
+        return entry
+
+    with result:
+        if result.status_code == 304 and entry is not None:
+            mark_cache_entry_checked(json_url)
+            _checked_urls.add(json_url)
+            return entry
+
+        if result.status_code == 200:
+            # The body goes straight to the disk cache a chunk at a
+            # time, instead of being held whole
+            try:
+                stored_entry = store_cache_entry(
+                    json_url,
+                    result.iter_content(chunk_size=STREAM_CHUNK_SIZE),
+                    result.headers
+                )
+            except requests.RequestException:
+                return entry
+
+            _checked_urls.add(json_url)
+            return stored_entry
+
+    # Any other reply (eg. a 503 that outlasted every retry) can't
+    # say whether the JSON changed, so the cached copy is still used
+    return entry
+
+
+def scrape_json(json_url):
+    """Retrieves a JSON url (through the disk cache, see
+    fetch_json_entry()) and returns a Response-like object for it.
+
+    Returns None if the JSON could not be retrieved.
+    """
+    if fetch_json_entry(json_url) is None:
+        return None
 
-    return scrape_website(json_url)
+    # The body stays on disk until it is needed, and json() decodes it
+    # from there a chunk at a time
+    return CachedResponse(json_url)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,445 @@
+"""A module that contains functions related to the local snapshot,
+a single compact file holding only the parts of every data source that
+this program actually reads, so that queries don't need the network.
+
+Alongside the snapshot is the operator record store, which holds every
+operator as a separate record so one operator can be read on its own."""
+
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import time
+import zlib
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from inputfuncs.input_reader import get_temporary_path
+from inputfuncs.cache_functions import get_cache_directory
+
+
+SNAPSHOT_MAGIC = b"ARKSNAP1"
+RECORDS_MAGIC = b"ARKRECS1"
+
+# The only stats create_stats_dict() ever reads from a key frame
+KEY_FRAME_STATS = [
+    "atk", "def", "maxHp", "magicResistance",
+    "blockCnt", "cost", "baseAttackTime", "respawnTime"
+]
+
+
+def get_snapshot_path() -> str:
+    """Retrieves the path the snapshot is stored at."""
+    return os.path.join(get_cache_directory(), "snapshot.ark")
+
+
+def snapshot_exists() -> bool:
+    """Checks to see if a snapshot has been created with `ark sync`."""
+    return os.path.isfile(get_snapshot_path())
+
+
+def get_manifest_path() -> str:
+    """Retrieves the path of the sync manifest."""
+    return os.path.join(get_cache_directory(), "manifest.json")
+
+
+def load_manifest() -> Dict[str, Any]:
+    """Loads the sync manifest, which matches the name of every source
+    the snapshot was compiled from to its url, the hash of its content
+    and the validators (ETag/Last-Modified) it was downloaded with.
+
+    Returns an empty manifest if there isn't one (or if it's broken).
+    """
+    try:
+        with open(get_manifest_path(), "r", encoding="utf8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"sources": {}}
+
+
+def write_manifest(sources: Mapping[str, Mapping[str, Any]]) -> None:
+    """Writes a new sync manifest (see load_manifest()) with the
+    specified sources."""
+    manifest_path = get_manifest_path()
+    temporary_path = get_temporary_path(manifest_path)
+
+    with open(temporary_path, "w", encoding="utf8") as f:
+        json.dump({"updated": time.time(), "sources": sources}, f)
+    os.replace(temporary_path, manifest_path)
+
+
+def get_operator_records_path() -> str:
+    """Retrieves the path of the operator record store, which holds
+    the records and their index in one file."""
+    return os.path.join(get_cache_directory(), "operators.rec")
+
+
+def operator_records_exist() -> bool:
+    """Checks to see if the operator record store has been created
+    with `ark sync`."""
+    try:
+        with open(get_operator_records_path(), "rb") as f:
+            return f.read(len(RECORDS_MAGIC)) == RECORDS_MAGIC
+    except OSError:
+        return False
+
+
+# Compiling functions
+def compile_operators(operator_json: Mapping[str, Any]) -> Dict[str, Any]:
+    """Strips the character JSON down to only the fields the parsers
+    read, and returns the smaller dictionary.
+
+    The structure of each operator stays exactly the same as in the
+    JSON, so the parsers can't tell the difference.
+    """
+    operators = {}
+
+    for operator_key, operator_dict in operator_json.items():
+        phases = [
+            {
+                "attributesKeyFrames": [
+                    {
+                        "data": {
+                            stat: key_frame["data"][stat]
+                            for stat in KEY_FRAME_STATS
+                            if stat in key_frame["data"].keys()
+                        }
+                    }
+                    for key_frame in phase["attributesKeyFrames"]
+                ]
+            }
+            for phase in operator_dict.get("phases") or []
+        ]
+
+        skills = [
+            {"skillId": skill["skillId"]}
+            for skill in operator_dict.get("skills") or []
+        ]
+
+        talents = [
+            {
+                "candidates": [
+                    {
+                        "name": stage["name"],
+                        "description": stage["description"],
+                        "unlockCondition": {
+                            "phase": stage["unlockCondition"]["phase"],
+                            "level": stage["unlockCondition"]["level"]
+                        },
+                        "requiredPotentialRank":
+                            stage["requiredPotentialRank"]
+                    }
+                    for stage in talent["candidates"] or []
+                ]
+            }
+            for talent in operator_dict.get("talents") or []
+        ]
+
+        operators[operator_key] = {
+            "name": operator_dict["name"],
+            "rarity": operator_dict["rarity"],
+            "profession": operator_dict["profession"],
+            "description": operator_dict["description"],
+            "itemUsage": operator_dict["itemUsage"],
+            "itemDesc": operator_dict["itemDesc"],
+            "tagList": operator_dict["tagList"],
+            "phases": phases,
+            "skills": skills,
+            "talents": talents,
+        }
+
+    return operators
+
+
+def compile_skills(skills_json: Mapping[str, Any]) -> Dict[str, Any]:
+    """Strips the skill JSON down to only the fields parse_skills()
+    reads, and returns the smaller dictionary."""
+    return {
+        skill_id: {
+            "levels": [
+                {
+                    "name": level["name"],
+                    "description": level["description"],
+                    "duration": level["duration"],
+                    "spData": {
+                        "spCost": level["spData"]["spCost"],
+                        "initSp": level["spData"]["initSp"]
+                    },
+                    "blackboard": [
+                        {"key": item["key"], "value": item["value"]}
+                        for item in level["blackboard"]
+                    ]
+                }
+                for level in skill["levels"]
+            ]
+        }
+        for skill_id, skill in skills_json.items()
+    }
+
+
+def compile_base_skills(
+        base_skills_json: Mapping[str, Any]
+) -> Dict[str, Any]:
+    """Strips the base skill JSON down to only the fields
+    parse_base_skills() reads, and returns the smaller dictionary."""
+    return {
+        "chars": {
+            operator_key: {
+                "buffChar": [
+                    {
+                        "buffData": [
+                            {
+                                "buffId": bskill["buffId"],
+                                "cond": {
+                                    "phase": bskill["cond"]["phase"],
+                                    "level": bskill["cond"]["level"]
+                                }
+                            }
+                            for bskill in bchar["buffData"]
+                        ]
+                    }
+                    for bchar in char["buffChar"]
+                ]
+            }
+            for operator_key, char in base_skills_json["chars"].items()
+        },
+        "buffs": {
+            buff_id: {
+                "buffName": buff["buffName"],
+                "roomType": buff["roomType"]
+            }
+            for buff_id, buff in base_skills_json["buffs"].items()
+        },
+    }
+
+
+def compile_riic(riic_json: Mapping[str, Any]) -> Dict[str, Any]:
+    """Strips the riic JSON down to only the names and descriptions of
+    each base skill, and returns the smaller dictionary."""
+    return {
+        buff_id: {"name": buff["name"], "desc": buff["desc"]}
+        for buff_id, buff in riic_json.items()
+    }
+
+
+def compile_recruit(
+        operatortags_list: Sequence[Mapping[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Strips the recruitment tag JSON down to only the fields
+    initialize_operator_list() reads, and returns the smaller list."""
+    return [
+        {
+            "name_en": operator["name_en"],
+            "level": operator["level"],
+            "tags": operator["tags"],
+            "type": operator["type"],
+            "hidden": operator["hidden"],
+            "globalHidden": operator.get("globalHidden", False),
+        }
+        for operator in operatortags_list
+    ]
+
+
+def compile_stat_rankings(
+        stat_rankings: Sequence[Mapping[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Strips the Gamepress stat rankings down to each operator's
+    title and max stats, and returns the smaller list."""
+    return [
+        {
+            key: value
+            for key, value in operator.items()
+            if key == "title" or key.startswith("max_")
+        }
+        for operator in stat_rankings
+    ]
+
+
+# Reading and writing functions
+def write_snapshot(
+        sections: Mapping[str, Any],
+        sources: Mapping[str, str]
+) -> int:
+    """Writes every section to a new snapshot, replacing the old one,
+    and returns the size of the new snapshot in bytes.
+
+    Each section is pickled and compressed on its own, and a small
+    header records where every section starts. That way, loading one
+    section never requires decompressing the others.
+
+    `sources` should match each section to a hash of the data it was
+    compiled from.
+
+    The old snapshot (if there is one) is kept next to the new one as
+    `snapshot.ark.prev`, so the two can be compared with `ark diff`.
+    """
+    blobs = {
+        name: zlib.compress(
+            pickle.dumps(section, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+        for name, section in sections.items()
+    }
+
+    header = {
+        "created": time.time(),
+        "sources": dict(sources),
+        "sections": {},
+    }
+    offset = 0
+    for name, blob in blobs.items():
+        header["sections"][name] = [offset, len(blob)]
+        offset += len(blob)
+
+    header_bytes = json.dumps(header).encode("utf8")
+
+    snapshot_path = get_snapshot_path()
+    temporary_path = get_temporary_path(snapshot_path)
+    os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+
+    with open(temporary_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(struct.pack(">I", len(header_bytes)))
+        f.write(header_bytes)
+        for blob in blobs.values():
+            f.write(blob)
+
+    if os.path.isfile(snapshot_path):
+        os.replace(snapshot_path, snapshot_path + ".prev")
+    os.replace(temporary_path, snapshot_path)
+
+    return os.path.getsize(snapshot_path)
+
+
+def _read_header(f) -> Dict[str, Any]:
+    """Reads the header of an open snapshot file, leaving the file
+    positioned right at the start of the first section."""
+    if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+        raise ValueError("Not an ark snapshot!")
+
+    (header_length,) = struct.unpack(">I", f.read(4))
+
+    return json.loads(f.read(header_length))
+
+
+def read_snapshot_header(
+        snapshot_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """Reads and returns the header of the snapshot (or of the snapshot
+    at the specified path), which has when it was created, the hash of
+    every source and where each section is."""
+    with open(snapshot_path or get_snapshot_path(), "rb") as f:
+        return _read_header(f)
+
+
+def load_snapshot_section(
+        name: str,
+        snapshot_path: Optional[str] = None
+) -> Any:
+    """Loads a single section from the snapshot (or from the snapshot
+    at the specified path) and returns it.
+
+    Only the requested section is read from the file and
+    decompressed.
+    """
+    with open(snapshot_path or get_snapshot_path(), "rb") as f:
+        header = _read_header(f)
+        offset, length = header["sections"][name]
+
+        f.seek(offset, os.SEEK_CUR)
+        return pickle.loads(zlib.decompress(f.read(length)))
+
+
+# Operator record store functions
+def write_operator_records(
+        operators: Mapping[str, Any],
+        version: str
+) -> int:
+    """Writes every operator (from a compiled operators section) to
+    a new record store, replacing the old one, and returns the size of
+    the records in bytes.
+
+    Each operator's record is pickled on its own and written right
+    after the previous one, so any single operator can be decoded
+    without touching the others. The index at the start of the file
+    matches each operator's key to the offset and length of its
+    record, and also stores the operator's name so names can be looked
+    up without decoding any record.
+
+    `version` should be a hash of the character JSON the operators
+    were compiled from.
+    """
+    records_path = get_operator_records_path()
+    temporary_path = get_temporary_path(records_path)
+    os.makedirs(os.path.dirname(records_path), exist_ok=True)
+
+    index = {}
+    records = []
+    offset = 0
+    for operator_key, operator_dict in operators.items():
+        record = pickle.dumps(operator_dict, protocol=pickle.HIGHEST_PROTOCOL)
+        records.append(record)
+
+        index[operator_key] = [offset, len(record), operator_dict["name"]]
+        offset += len(record)
+
+    index_bytes = json.dumps(
+        {"version": version, "records": index}
+    ).encode("utf8")
+
+    with open(temporary_path, "wb") as f:
+        f.write(RECORDS_MAGIC)
+        f.write(struct.pack(">I", len(index_bytes)))
+        f.write(index_bytes)
+        for record in records:
+            f.write(record)
+
+    # The index and records are replaced together in one go, so a
+    # reader always gets an index that matches the records it maps
+    os.replace(temporary_path, records_path)
+
+    return offset
+
+
+def open_operator_records() -> Tuple[Dict[str, Any], memoryview]:
+    """Reads the operator record index and memory-maps the records,
+    and returns both as a tuple of (index, records).
+
+    The index is a dict with the `version` of the records and the
+    `records` themselves (each operator's key matched with
+    [offset, length, name]). Both come from the same open file, so
+    they always match, even if a sync replaces the store meanwhile.
+
+    Nothing in the records is actually read until a record is
+    decoded, and since the file is mapped read only, every process
+    looking up operators shares the same pages of memory.
+    """
+    with open(get_operator_records_path(), "rb") as f:
+        if f.read(len(RECORDS_MAGIC)) != RECORDS_MAGIC:
+            raise ValueError("Not an ark record store!")
+
+        (index_length,) = struct.unpack(">I", f.read(4))
+        index = json.loads(f.read(index_length))
+
+        # The mapping stays valid after the file is closed
+        records = memoryview(
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        )[len(RECORDS_MAGIC) + 4 + index_length:]
+
+    return index, records
+
+
+def read_operator_record(
+        records: memoryview,
+        offset: int,
+        length: int
+) -> Dict[str, Any]:
+    """Decodes a single operator's record from the memory-mapped
+    records (see open_operator_records()) and returns it."""
+    return pickle.loads(records[offset:offset + length])
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
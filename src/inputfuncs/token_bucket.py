@@ -0,0 +1,70 @@
+"""A module that contains the TokenBucket class, which keeps any
+number of threads from sending requests faster than a set rate."""
+
+import sys
+import threading
+import time
+
+
+class TokenBucket:
+    """A thread-safe token bucket rate limiter.
+
+    The bucket holds up to `capacity` tokens and gains `rate` tokens
+    every second. Every request takes a token, waiting for one if the
+    bucket is empty, so short bursts are allowed but the average rate
+    never goes over `rate` requests per second.
+
+    Public variables:
+
+    rate -- float,
+
+    capacity -- float
+
+    Public methods:
+
+    acquire()
+
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Initializes a full TokenBucket object.
+
+        Keyword arguments:
+
+        rate -- float, how many tokens are added every second
+
+        capacity -- float, the most tokens the bucket can hold (at
+        least 1)
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Takes a token from the bucket, waiting until there is one
+        if needed. Nothing is returned."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait_time = (1 - self._tokens) / self.rate
+
+            # Waiting outside the lock lets other threads check too
+            time.sleep(wait_time)
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
@@ -16,19 +16,56 @@ from inputfuncs.input_reader import (
     read_line_from_file,
     read_lines_into_dict
 )
-from inputfuncs.scraper_functions import scrape_json
+from inputfuncs.cache_functions import (
+    load_cache_entry,
+    describe_age
+)
+from inputfuncs.scraper_functions import (
+    scrape_json,
+    is_offline_mode
+)
+from inputfuncs.snapshot_functions import (
+    snapshot_exists,
+    read_snapshot_header,
+    load_snapshot_section
+)
+from scraperfuncs.database_functions import (
+    database_exists,
+    connect_to_database,
+    query_recruit_operators
+)
 
 # TODO: move some of the functions into a recruitfuncs module?
 ### FUNCTIONS ########################
 
 
+def get_tag_data_time() -> Optional[float]:
+    """Retrieves when the recruitment json was downloaded (or when the
+    snapshot was created, if there is one), as a timestamp.
+
+    Returns None if the json was never downloaded.
+    """
+    if snapshot_exists():
+        return read_snapshot_header()["created"]
+
+    entry = load_cache_entry(read_line_from_file(
+        "./info/recruitops/recruitTagJsonUrl.txt"
+    ))
+    if entry is None:
+        return None
+
+    return entry["fetched"]
+
+
 def initialize_operator_list() -> Optional[List[Type[TaggedOperator]]]:
     """Initializes a list of TaggedOperators with names and tags and
     returns said list.
 
     This function uses a recruitment json created by Aceship to find
     each operator's tags, so if this function is unable to find the
-    json, it will return None which should be caught.
+    json, it will return None which should be caught. If a snapshot
+    was created with `ark sync`, the operators are read from the
+    operator database (or the snapshot) instead.
 
     Otherwise, it will generate a list of TaggedOperator objects, each
     with a name, rarity, and recruitment tags.
@@ -36,25 +73,47 @@ def initialize_operator_list() -> Optional[List[Type[TaggedOperator]]]:
     Note that hidden operators (globalHidden or hidden) will not be
     included in this list.
     """
-    operatortags_rawjson = scrape_json(read_line_from_file(
-        "./info/recruitops/recruitTagJsonUrl.txt"
-    ))
-    # with open("tags_zh.json", "r", encoding="utf8") as f:
-    #     operatortags_rawjson = json.load(f)  # debug
-
-    if operatortags_rawjson is None:
-        return None
-
-    # Getting the json content returns a list, so we call it a
-    # list appropriately
-    operatortags_list = operatortags_rawjson.json()
-    # operatortags_list = operatortags_rawjson # debug
-    operator_list = []
-
     name_replacements = read_lines_into_dict(
         "./info/recruitops/operatorNameReplacements.txt"
     )
 
+    # The operator database already leaves out hidden operators and
+    # counts each operator's class as a tag
+    if database_exists():
+        connection = connect_to_database()
+        try:
+            recruit_operators = query_recruit_operators(connection)
+        finally:
+            connection.close()
+
+        return [
+            TaggedOperator(
+                name_replacements.get(operator["name"], operator["name"]),
+                operator["rarity"],
+                operator["tags"]
+            )
+            for operator in recruit_operators
+        ]
+
+    if snapshot_exists():
+        operatortags_list = load_snapshot_section("recruit")
+    else:
+        operatortags_rawjson = scrape_json(read_line_from_file(
+            "./info/recruitops/recruitTagJsonUrl.txt"
+        ))
+        # with open("tags_zh.json", "r", encoding="utf8") as f:
+        #     operatortags_rawjson = json.load(f)  # debug
+
+        if operatortags_rawjson is None:
+            return None
+
+        # Getting the json content returns a list, so we call it a
+        # list appropriately
+        operatortags_list = operatortags_rawjson.json()
+        # operatortags_list = operatortags_rawjson # debug
+
+    operator_list = []
+
     # initialize an easy to access list of operators and their tags
     #
     # Some operators aren't available in HH and thus they are labelled
@@ -374,7 +433,13 @@ def find_recruitment_combos(args: argparse.Namespace) -> None:
     spinner.start()
 
     op_list = initialize_operator_list()
-    if op_list is None:
+    if op_list is None and is_offline_mode():
+        spinner.fail("Failed.")
+        sys.stdout.write(
+            "\n\nThe tag JSON has not been downloaded yet, so it can't "
+            + "be used offline! Run `ark.py sync` while online first.\n\n"
+        )
+    elif op_list is None:
         spinner.fail("Failed.")
         sys.stdout.write(
             "\n\nThe tag JSON could not be fetched! Try again later."
@@ -436,6 +501,12 @@ def find_recruitment_combos(args: argparse.Namespace) -> None:
         # Print the recruitment results
         spinner.succeed("Success!")
         sys.stdout.write("\n\nRecruitment Results\n\n")  # padding
+        if is_offline_mode():
+            sys.stdout.write(
+                "Offline; using tag data downloaded "
+                + describe_age(get_tag_data_time())
+                + ".\n\n"
+            )
         sys.stdout.write(
             "Note: the lower down the tag collection, "
             + "the better the tags.\n\n\n"
@@ -3,20 +3,27 @@ function in the 'ark' library, with both JSON parsing and Gamepress
 implementation implemented."""
 
 import argparse
+import hashlib
 import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Optional
 
 from halo import Halo  # extremely important
-from bs4 import BeautifulSoup
 
 from operatorclasses.operator import Operator
 
-from inputfuncs.input_reader import (
-    read_lines_into_dict,
-    read_line_from_file
+from inputfuncs.input_reader import read_lines_into_dict
+from inputfuncs.progress_line import ProgressLine
+from inputfuncs.cache_functions import (
+    describe_age,
+    get_page_cache_settings,
+    load_rendered_output,
+    store_rendered_output
 )
 from inputfuncs.scraper_functions import (
     scrape_for_operator,
-    scrape_json
+    forget_operator_page,
+    is_offline_mode
 )
 from scraperfuncs.global_parser_functions import parse_stats
 
@@ -26,76 +33,55 @@ from scraperfuncs.gamepress_search_functions import (
     find_base_skills,
     create_stats_json,
     find_siblings_of_breakpoint,
-    find_skills
+    find_skills,
+    parse_operator_page
 )
 
 # Import the needed search functions for Aceship's JSON
 from scraperfuncs.json_parser_functions import (
     filter_description,
-    create_stats_dict,
     parse_talents,
     parse_skills,
     parse_base_skills
 )
+from scraperfuncs.data_context import DataContext
 
 
 ### FUNCTIONS ########################
 
 
-def get_operator_dict(operator):
-    """Searches the Aceship character JSON for a specified operator,
-    and returns the associated character dict and the character key
-    in the JSON if found.
+def get_operator_dict(operator, context):
+    """Looks up a specified operator in the Aceship character JSON
+    (from the provided DataContext), and returns the associated
+    character dict and the character key in the JSON if found.
+
+    The operator is found through the stored name index, so an
+    operator that isn't in the JSON is known to be missing without
+    searching (or even decoding) the JSON.
 
     If the operator was not found, return an empty dict and None
     for the key, indicating that the scraper should try using
     Gamepress instead of the JSON, as the character is not
     in the JSON yet.
     """
-    # Since the JSON I first use to find info uses
-    # properly formatted names, I have to convert any name
-    # to a properly formatted one
-
-    # TODO: Does this break DRY? This appears in gamepress too
-    replacement_names = read_lines_into_dict(
-        "./info/scraper/jsonOperatorReplacements.txt"
-    )
-
+    # The name index uses properly formatted names (and also knows
+    # about the names in jsonOperatorReplacements.txt), so we just
+    # need to format the name the same way
     formatted_name = operator.replace("-", " ").title()
-    proper_name = (
-        formatted_name
-        if formatted_name not in replacement_names.keys()
-        else replacement_names[formatted_name]
-    )
 
-    # with open("character_table.json", "r", encoding="utf8") as f:
-    #     operator_raw_json = json.load(f)  # debug
-    operator_raw_json = scrape_json(read_line_from_file(
-        "./info/scraper/operatorJsonUrl.txt"
-    ))
-    if operator_raw_json is None:
+    operator_key = context.find_operator_key(formatted_name)
+    if operator_key is None:
         return {}, None
 
-    operator_dict = {}
-    operator_key = None
-    operator_json = operator_raw_json.json()
-    # operator_json = operator_raw_json #debug
-    for operator in operator_json.keys():
-        # So that names like "SilverAsh" don't screw up the parser,
-        # we take the key and convert it to the title form (Silverash)
-        if operator_json[operator]["name"].title() == proper_name:
-            operator_key = operator
-            operator_dict = operator_json[operator]
-            break
-
-    return operator_dict, operator_key
+    return context.get_operator(operator_key), operator_key
 
 
 def parse_operator_data(
         args,
         operator_dict,
         operator_key,
-        operator
+        operator,
+        context
 ):
     """ Depending on whether operator_dict is empty or not, get
     operator information from either Gamepress or the JSON files,
@@ -104,23 +90,78 @@ def parse_operator_data(
     if operator_dict == {} or args.gamepress:
         operator = get_info_from_gamepress(
             args,
-            operator
+            operator,
+            context
         )
     else:
         operator = parse_info_from_json(
             args,
             operator_dict,
-            operator_key
+            operator_key,
+            context
         )
 
     return operator
 
 
-def get_info_from_gamepress(args, operator_name):
+def race_operator_sources(args, operator_name, context):
+    """Looks up an operator in the JSONs and on Gamepress at the same
+    time, and returns a tuple of (Operator object, whether the object
+    came from Gamepress) built from whichever source found the
+    operator first.
+
+    This is for operators that probably aren't in the JSONs yet, where
+    going through the JSONs first would mean downloading and searching
+    the character JSON before even starting on the Gamepress page.
+    The slower source is left to finish in the background, so anything
+    it downloads is still cached.
+
+    Returns (None, False) if neither source found the operator.
+    """
+    def parse_from_json():
+        operator_dict, operator_key = get_operator_dict(
+            operator_name, context
+        )
+        if operator_dict == {}:
+            return None
+
+        return parse_info_from_json(
+            args, operator_dict, operator_key, context
+        )
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    lookups = {
+        executor.submit(parse_from_json): False,
+        executor.submit(
+            get_info_from_gamepress, args, operator_name, context
+        ): True,
+    }
+    executor.shutdown(wait=False)
+
+    pending = set(lookups.keys())
+    while len(pending) > 0:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+        for lookup in done:
+            try:
+                operator = lookup.result()
+            except Exception:
+                operator = None  # a broken source just loses the race
+
+            if operator is not None:
+                return operator, lookups[lookup]
+
+    return None, False
+
+
+def get_info_from_gamepress(args, operator_name, context):
     """Gets information for a certain operator from a Gamepress
     page, and return an Operator object with the necessary information
     based on the flags in args.
 
+    The stat rankings JSON needed for stats is taken from the provided
+    DataContext.
+
     If no Gamepress page is found with the specified operator's name
     (or the page is down), this function will return None.
 
@@ -144,8 +185,8 @@ def get_info_from_gamepress(args, operator_name):
             "./info/scraper/jsonOperatorReplacements.txt"
         )
 
-        soup = BeautifulSoup(src, "lxml")
-        # soup = BeautifulSoup(open("debug.html", "r", encoding="utf-8"), "lxml") # debugging
+        soup = parse_operator_page(src)
+        # soup = parse_operator_page(open("debug.html", "rb").read()) # debugging
 
         # Finding the default information that should be displayed
         # for every operator (eg. tags, description, etc.)
@@ -258,7 +299,7 @@ def get_info_from_gamepress(args, operator_name):
         stats_requirements = [
             args.info,
             create_stats_json,
-            [soup, proper_name]
+            [soup, proper_name, context.stat_index]
         ]
         # Set the operator object's properties based on conditional
         # list
@@ -275,13 +316,15 @@ def get_info_from_gamepress(args, operator_name):
     return operator
 
 
-def parse_info_from_json(args, operator_dict, operator_key):
+def parse_info_from_json(args, operator_dict, operator_key, context):
     """Gets information for a certain operator from various JSON
     files, and return an Operator object with the necessary information
     based on the flags in args.
 
     This function assumes a check was already done to ensure the
-    operator exists in the JSON files.
+    operator exists in the JSON files. Everything else needed (stats,
+    skills, talents and base skills) is taken from the provided
+    DataContext.
 
     Like the Gamepress function, this function independantly
     gathers the barebones information (name, rarity, description, etc.),
@@ -333,26 +376,26 @@ def parse_info_from_json(args, operator_dict, operator_key):
             "skills",
             check_skills,
             parse_skills,
-            [operator_dict, skill_tiers_to_check]
+            [operator_key, skill_tiers_to_check, context]
         ],
         [
             "talent",
             args.talent,
             parse_talents,
-            [operator_dict]
+            [operator_key, context]
         ],
         [
             "base skills",
             args.base,
             parse_base_skills,
-            [operator_key]
+            [operator_key, context]
         ],
     ]
 
     stats_requirements = [
         args.info,
-        create_stats_dict,
-        [operator_dict]
+        context.get_operator_stats,
+        [operator_key]
     ]
 
     set_operator_properties(
@@ -394,93 +437,369 @@ def set_operator_properties(args, conds, stats_conds, operator):
     if stats_flag or args.all:
         operator.stats = stats_func(*stats_args)
 
-######################################
 
+def get_render_key(args, operator_name):
+    """Creates the key that an operator's rendered output is stored
+    under, made from the operator's name and the flags that actually
+    change the output.
+
+    Flags are normalized first, so (for example) `-a` and `-s -i -t -b`
+    share the same key.
+    """
+    flags = ""
+    if args.vskills:
+        flags += "v"
+    elif args.skills or args.all:
+        flags += "s"
+
+    flags += "i" if args.info or args.all else ""
+    flags += "t" if args.talent or args.all else ""
+    flags += "b" if args.base or args.all else ""
+    flags += "g" if args.gamepress else ""
+
+    return operator_name.replace("-", " ").title() + "|" + flags
+
+
+def get_needed_sources(args):
+    """Works out which data sources (named the same way as the
+    snapshot sections) a lookup with the specified flags will read,
+    and returns them as a list.
+
+    The stat rankings are only counted when Gamepress is forced, since
+    otherwise they're only needed for operators missing from the JSON.
+    """
+    sources = []
+    if not args.gamepress:
+        sources.append("operators")
+
+        if args.skills or args.vskills or args.all:
+            sources.append("skills")
+        if args.base or args.all:
+            sources += ["base_skills", "riic"]
+    elif args.info or args.all:
+        sources.append("stat_rankings")
+
+    return sources
+
+
+def get_render_version(args, context):
+    """Creates a hash of every piece of data the output for the
+    specified flags depends on (the needed JSONs and the info files
+    used for formatting), and returns it.
+
+    Returns None if any of the needed JSONs can't be retrieved.
+    """
+    data_version = context.get_data_version(get_needed_sources(args))
+    if data_version is None:
+        return None
+
+    render_version = hashlib.sha1(data_version.encode("utf8"))
+    for info_file in [
+            "./info/scraper/imageToText.txt",
+            "./info/scraper/jsonOperatorReplacements.txt",
+            "./info/scraper/formattedJsonProfessions.txt",
+            "./info/scraper/urlOperatorReplacements.txt"
+    ]:
+        with open(info_file, "rb") as f:
+            render_version.update(f.read())
+
+    return render_version.hexdigest()
+
+
+def render_operator(operator, used_gamepress):
+    """Formats everything stored in an Operator object into the list
+    of strings that gets printed to the screen, and returns it."""
+    output = []
+
+    if used_gamepress:
+        output.append("\nSkipping JSON; Using gamepress.\n")
+
+    output.append("\n\n" + operator.name + "   ")
+    output.append("*" * operator.rarity + "   ")  # Star rarity
+    output.append(operator.profession + "\n")
+
+    output.append(operator.get_formatted_tags() + "\n\n")
+
+    for desc_text in operator.description:
+        output.append(desc_text)
+
+    all_properties = [
+        operator.get_property(prop)
+        for prop in operator.get_all_properties()
+    ]
+    # Fetch the stats
+    all_messages = (
+        [parse_stats(operator.stats)] + all_properties
+        if (operator.has_stats())
+        else all_properties
+    )
+
+    for prop in all_messages:
+        for text in prop:
+            output.append(text + "\n")
+
+    return output
+
+
+def render_failure(operator_name):
+    """Creates the list of strings that gets printed to the screen when
+    an operator can't be found, and returns it."""
+    return [
+        "\n\n" + operator_name.replace("-", " ").title() + "\n",
+        "\n"
+        + "Could not find operator! "
+        + "Either the server is down, or your spelling is! \n"
+    ]
+
+
+def is_hedged(args, operator_name, context):
+    """Checks whether an operator should be looked up in the JSONs and
+    on Gamepress at the same time (see race_operator_sources()), which
+    is when the hedge flag is specified and the operator isn't in the
+    name index that's already on disk."""
+    return (
+        args.hedge
+        and not args.gamepress
+        and not context.is_operator_indexed(
+            operator_name.replace("-", " ").title()
+        )
+    )
 
-def find_operator_info(
-        args: argparse.Namespace,
-        operator_name: str
-) -> None:
-    """With the specified arguments, calls all the functions
-    needed to find information and print all information
-    out to the screen.
+
+def look_up_operator(args, operator_name, context, spinner=None):
+    """Finds all the information about an operator that the flags in
+    args ask for, and returns the rendered output as a list of
+    strings. Nothing is printed.
 
     This function will determine whether to use Gamepress
     or JSON for information, then call either one's appropriate
     information-getting functions and build an Operator object using
     the provided information.
 
-    The Operator object will be used for printing. Nothing is returned.
+    The final output is stored along with a version of the data it
+    was made from, so asking for the same operator with the same flags
+    again just returns the stored output (until the data changes).
+    Output made from Gamepress also expires with the page cache.
+    Hedged lookups (see is_hedged()) are never stored, since they're
+    for operators whose data isn't settled yet.
+
+    If a spinner is provided, its text is updated as the lookup moves
+    along. Returns None if the operator could not be found.
     """
-    spinner = Halo(text="Fetching...", spinner="dots", color="magenta")
-    # Initialize the arguments for cmd purposes
-    spinner.start()
+    render_key = get_render_key(args, operator_name)
+    # Working out the version could mean downloading every JSON first,
+    # which is exactly what hedging is there to avoid
+    render_version = (
+        None if is_hedged(args, operator_name, context)
+        else get_render_version(args, context)
+    )
 
-    operator_dict, operator_key = get_operator_dict(operator_name)
+    # A refresh means the stored output is probably out of date too
+    output = (
+        None if render_version is None or args.refresh
+        else load_rendered_output(render_key, render_version)
+    )
+    if output is not None:
+        return output
 
-    spinner.text = "Parsing..."
-    spinner.color = "yellow"
+    if is_hedged(args, operator_name, context):
+        operator, used_gamepress = race_operator_sources(
+            args, operator_name, context
+        )
+    else:
+        operator_dict, operator_key = get_operator_dict(
+            operator_name, context
+        )
 
-    operator = parse_operator_data(
-        args,
-        operator_dict,
-        operator_key,
-        operator_name)
-    # ----------------------------------------
+        if spinner is not None:
+            spinner.text = "Parsing..."
+            spinner.color = "yellow"
 
-    if operator is not None:
-        spinner.succeed("Success!")
-        if operator_dict == {} or args.gamepress:
-            sys.stdout.write("\nSkipping JSON; Using gamepress.\n")
+        operator = parse_operator_data(
+            args,
+            operator_dict,
+            operator_key,
+            operator_name,
+            context)
+        # ----------------------------------------
+
+        used_gamepress = operator_dict == {} or args.gamepress
+
+    if operator is None:
+        return None
+
+    output = render_operator(operator, used_gamepress)
+
+    if render_version is not None:
+        store_rendered_output(
+            render_key,
+            render_version,
+            output,
+            (
+                get_page_cache_settings()["page_ttl"]
+                if used_gamepress
+                else None
+            )
+        )
 
-        # Print out the results
-        sys.stdout.write("\n\n" + operator.name + "   ")
-        sys.stdout.write("*" * operator.rarity + "   ")  # Star rarity
-        sys.stdout.write(operator.profession + "\n")
+    return output
 
-        sys.stdout.write(operator.get_formatted_tags() + "\n\n")
+######################################
 
-        for desc_text in operator.description:
-            sys.stdout.write(desc_text)
 
-        all_properties = [
-            operator.get_property(prop)
-            for prop in operator.get_all_properties()
-        ]
-        # Fetch the stats
-        all_messages = (
-            [parse_stats(operator.stats)] + all_properties
-            if (operator.has_stats())
-            else all_properties
-        )
+def find_operator_info(
+        args: argparse.Namespace,
+        operator_name: str,
+        context: Optional[DataContext] = None
+) -> None:
+    """With the specified arguments, calls all the functions
+    needed to find information and print all information
+    out to the screen (see look_up_operator()). Nothing is returned.
+
+    If a DataContext is provided, any JSON it already loaded is
+    reused instead of being fetched again. Otherwise, a new one is
+    created just for this operator.
+    """
+    if context is None:
+        context = DataContext()
+
+    spinner = Halo(text="Fetching...", spinner="dots", color="magenta")
+    # Initialize the arguments for cmd purposes
+    spinner.start()
 
-        for prop in all_messages:
-            for text in prop:
-                sys.stdout.write(text + "\n")
+    output = look_up_operator(args, operator_name, context, spinner)
 
+    if output is not None:
+        spinner.succeed("Success!")
     else:
         spinner.fail("Failed.")
-        sys.stdout.write(
-            "\n\n"
-            + operator_name.replace("-", " ").title()
-            + "\n"
-        )
-        sys.stdout.write(
-            "\n"
-            + "Could not find operator! "
-            + "Either the server is down, or your spelling is! \n"
-        )
+        output = render_failure(operator_name)
 
+    # Print out the results
+    for text in output:
+        sys.stdout.write(text)
     sys.stdout.write("\n\n")
 
 
+def format_lookup_result(
+        args: argparse.Namespace,
+        index: int,
+        output: Optional[List[str]]
+) -> str:
+    """Joins the output of the index-th operator in args.operator into
+    the text that gets printed for it, including the separator that
+    goes between operators. If the operator couldn't be found (the
+    output is None), the failure message is used instead."""
+    if output is None:
+        output = render_failure(args.operator[index])
+
+    return (
+        "".join(output)
+        + "\n\n"
+        + (
+            ""
+            if index + 1 == len(args.operator)
+            else "------------------------------------\n\n"
+        )
+    )
+
+
+def find_operators_in_parallel(
+        args: argparse.Namespace,
+        context: DataContext
+) -> None:
+    """Looks up the operators in args.operator in a pool of
+    args.jobs threads, and prints each one's info to the screen in the
+    same order the operators were given. Nothing is returned.
+
+    The main thread only prints: each result is printed as soon as it
+    and every result before it are finished, while one progress line
+    under the printed results shows how many lookups are done. Every
+    lookup shares the same DataContext, so each shared JSON is still
+    only decoded once.
+    """
+    progress = ProgressLine("Looking up", len(args.operator))
+    progress.start()
+
+    def look_up(operator_name):
+        try:
+            return look_up_operator(args, operator_name, context)
+        finally:
+            progress.advance()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as executor:
+            lookups = [
+                executor.submit(look_up, operator_name)
+                for operator_name in args.operator
+            ]
+
+            for index, lookup in enumerate(lookups):
+                progress.write(
+                    format_lookup_result(args, index, lookup.result())
+                )
+    finally:
+        progress.finish()
+
+
 def find_all_operator_info(
         args: argparse.Namespace
 ) -> None:
     """Finds each operator's info as specified in args.operator and
-    prints the info the the screen."""
+    prints the info the the screen.
+
+    Every operator shares one DataContext, so each JSON is only
+    fetched and decoded once for the whole run. If only one operator
+    is being looked up, the JSONs are streamed instead, since decoding
+    every operator just to print one of them is a waste.
+
+    If the refresh flag is specified, each operator's cached Gamepress
+    page is forgotten before it is looked up.
+
+    In offline mode, how old the local data is gets printed first, and
+    nothing is looked up if there is no local data to use.
+
+    Unless the hedge flag is specified, every JSON the flags need is
+    downloaded at the same time before anything is looked up (see
+    DataContext.prefetch()). With more than one job, the operators
+    themselves are also looked up at the same time (see
+    find_operators_in_parallel()).
+    """
+    context = DataContext(streaming=len(args.operator) == 1)
+    # Hedged lookups shouldn't wait for every JSON to download
+    if not args.hedge:
+        context.prefetch(get_needed_sources(args))
+
+    if is_offline_mode():
+        data_time = context.get_data_time()
+
+        # Gamepress pages are cached separately, so they might
+        # still be there
+        if data_time is None and not args.gamepress:
+            sys.stdout.write(
+                "\n\nNo operator data has been downloaded yet, so "
+                + "nothing can be looked up offline! Run `ark.py sync` "
+                + "while online first.\n\n"
+            )
+            return
+
+        if data_time is not None:
+            sys.stdout.write(
+                "\nOffline; using operator data downloaded "
+                + describe_age(data_time)
+                + ".\n\n"
+            )
+
+    if args.refresh:
+        for operator in args.operator:
+            forget_operator_page(operator)
+
+    if args.jobs > 1:
+        find_operators_in_parallel(args, context)
+        return
+
     for index, operator in enumerate(args.operator):
-        find_operator_info(args, operator)
+        find_operator_info(args, operator, context)
         sys.stdout.write(
             ""
             if index + 1 == len(args.operator)
@@ -0,0 +1,716 @@
+"""This module contains the DataContext class, which holds on to the
+Aceship JSONs for the duration of one run so that each JSON is only
+fetched and decoded once, no matter how many operators are looked up.
+
+If a snapshot was created with `ark sync`, the JSONs are read from
+the snapshot instead, and nothing is fetched at all. Single operators
+are read from the memory-mapped operator record store, and everything
+else about them is looked up in the operator database.
+
+When only one operator is looked up, the JSONs can also be streamed
+from the disk cache instead, so that only the entries for that one
+operator are ever decoded."""
+
+import hashlib
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from inputfuncs.input_reader import (
+    read_line_from_file,
+    read_lines_into_dict
+)
+from inputfuncs.scraper_functions import (
+    scrape_json,
+    fetch_json_entry
+)
+from inputfuncs.cache_functions import (
+    load_cache_entry,
+    iter_cached_body
+)
+from inputfuncs.json_stream_functions import (
+    iter_json_items,
+    find_raw_json_items,
+    find_json_items,
+    find_json_item
+)
+from inputfuncs.snapshot_functions import (
+    snapshot_exists,
+    read_snapshot_header,
+    load_snapshot_section,
+    operator_records_exist,
+    open_operator_records,
+    read_operator_record
+)
+from scraperfuncs.json_parser_functions import (
+    get_skill_jsons,
+    get_base_jsons,
+    create_stats_dict,
+    extract_talents,
+    extract_skill_levels,
+    extract_base_skills
+)
+from scraperfuncs.gamepress_search_functions import (
+    get_stat_rankings_url,
+    get_stat_rankings
+)
+from scraperfuncs.database_functions import (
+    database_exists,
+    connect_to_database,
+    query_operator_key,
+    query_operator,
+    query_operator_stats,
+    query_operator_talents,
+    query_operator_skill_ids,
+    query_skill_levels,
+    query_operator_base_skills
+)
+from scraperfuncs.index_functions import (
+    load_index,
+    read_stored_index,
+    build_name_index,
+    build_stat_index
+)
+
+
+def get_source_url(name: str) -> str:
+    """Retrieves the url of a data source, named the same way as the
+    snapshot sections (eg. "operators", "skills")."""
+    if name == "stat_rankings":
+        return get_stat_rankings_url()
+
+    return read_line_from_file({
+        "operators": "./info/scraper/operatorJsonUrl.txt",
+        "skills": "./info/scraper/skillsJsonUrl.txt",
+        "base_skills": "./info/scraper/baseSkillsJsonUrl.txt",
+        "riic": "./info/scraper/riicJsonUrl.txt",
+    }[name])
+
+
+def get_operator_json() -> Dict[str, Any]:
+    """Loads the character JSON that contains every operator and
+    returns it.
+
+    If the JSON fails to load, this function will return an empty
+    dictionary in place of the JSON file.
+    """
+    operator_req = scrape_json(read_line_from_file(
+        "./info/scraper/operatorJsonUrl.txt"
+    ))
+
+    if operator_req is None:
+        return {}
+
+    return operator_req.json()
+
+
+class DataContext:
+    """The class for sharing the Aceship JSONs between every operator
+    looked up in a single run.
+
+    Nothing is loaded when the context is created. Each JSON is only
+    fetched (and decoded) the first time something asks for it, so
+    a run that never needs a JSON never pays for it.
+
+    A JSON that failed to load is remembered as an empty dict, the
+    same way the loading functions report failure, so a failed JSON
+    isn't requested again for every operator either.
+
+    If a snapshot exists when the context is created, every JSON is
+    loaded from its section of the snapshot instead. If the operator
+    database exists, the get_* methods query the database instead
+    of searching through the JSONs, so the JSONs are never loaded.
+    If the operator record store exists, operators themselves are
+    looked up by name in its index and decoded one record at a time.
+
+    A streaming context (meant for looking up a single operator) never
+    loads a whole JSON unless there's a snapshot. Instead, each lookup
+    walks through the cached copy of the JSON and only decodes the
+    entries it needs, stopping as soon as they're found.
+
+    Public variables:
+
+    database
+
+    record_index
+
+    records
+
+    operator_json
+
+    skills_json
+
+    base_jsons
+
+    stat_index
+
+    skills_available
+
+    base_skills_available
+
+    Public methods:
+
+    find_operator_key(name)
+
+    is_operator_indexed(name)
+
+    get_operator(operator_key)
+
+    get_operator_stats(operator_key)
+
+    get_operator_talents(operator_key)
+
+    get_operator_skill_ids(operator_key)
+
+    get_skill_levels(skill_id)
+
+    get_operator_base_skills(operator_key)
+
+    prefetch(sources)
+
+    get_data_version(sources)
+
+    get_data_time()
+
+    """
+
+    def __init__(self, streaming: bool = False) -> None:
+        """Initializes an empty DataContext.
+
+        Keyword arguments:
+
+        streaming -- bool, whether to stream entries out of the JSONs
+        instead of decoding them whole (default False)
+        """
+        self._tables = {}
+        self._table_locks = {}
+        self._table_locks_lock = threading.Lock()
+        self._use_snapshot = snapshot_exists()
+        self._use_database = database_exists()
+        self._use_records = operator_records_exist()
+        self._streaming = streaming and not self._use_snapshot
+
+    def _get_table(self, name: str, loader: Callable[[], Any]) -> Any:
+        """Retrieves a loaded JSON by name, calling the loader
+        function to load it first if this is the first time it is
+        asked for.
+
+        Each table has its own lock, so lookups running in different
+        threads never load the same table twice, but can still load
+        different tables at the same time.
+        """
+        if name in self._tables.keys():
+            return self._tables[name]
+
+        with self._table_locks_lock:
+            table_lock = self._table_locks.setdefault(name, threading.Lock())
+
+        with table_lock:
+            if name not in self._tables.keys():
+                self._tables[name] = loader()
+
+        return self._tables[name]
+
+    def _get_streamable_url(self, url_file: str) -> Optional[str]:
+        """Makes sure the JSON whose url is in the specified file is in
+        the disk cache (and up to date), then returns its url so it
+        can be streamed with iter_cached_body().
+
+        Returns None if the JSON can't be retrieved.
+        """
+        def fetch_url():
+            url = read_line_from_file(url_file)
+
+            return None if fetch_json_entry(url) is None else url
+
+        return self._get_table("url " + url_file, fetch_url)
+
+    def _find_streamed_items(
+            self,
+            url_file: str,
+            keys: List[str]
+    ) -> Dict[str, Any]:
+        """Finds and decodes only the specified top-level entries of
+        the JSON whose url is in the specified file.
+
+        Returns an empty dict if the JSON can't be retrieved.
+        """
+        url = self._get_streamable_url(url_file)
+        if url is None:
+            return {}
+
+        return find_json_items(iter_cached_body(url), keys)
+
+    @property
+    def database(self):
+        """Retrieves the connection to the operator database."""
+        return self._get_table("database", connect_to_database)
+
+    @property
+    def record_index(self) -> Dict[str, Any]:
+        """Retrieves the index of the operator record store."""
+        return self._get_table("record store", open_operator_records)[0]
+
+    @property
+    def records(self) -> memoryview:
+        """Retrieves the memory-mapped operator records, which always
+        match the record index."""
+        return self._get_table("record store", open_operator_records)[1]
+
+    @property
+    def operator_json(self) -> Dict[str, Any]:
+        """Retrieves the character JSON."""
+        if self._use_snapshot:
+            return self._get_table(
+                "operators", lambda: load_snapshot_section("operators")
+            )
+
+        return self._get_table("operators", get_operator_json)
+
+    @property
+    def skills_json(self) -> Dict[str, Any]:
+        """Retrieves the skill JSON."""
+        if self._use_snapshot:
+            return self._get_table(
+                "skills", lambda: load_snapshot_section("skills")
+            )
+
+        return self._get_table("skills", get_skill_jsons)
+
+    @property
+    def base_jsons(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Retrieves both JSONs needed for base skills, as a tuple of
+        (base skills JSON, riic JSON)."""
+        if self._use_snapshot:
+            return self._get_table(
+                "base skills",
+                lambda: (
+                    load_snapshot_section("base_skills"),
+                    load_snapshot_section("riic")
+                )
+            )
+
+        return self._get_table("base skills", get_base_jsons)
+
+    @property
+    def stat_index(self) -> Dict[str, Dict[str, Any]]:
+        """Retrieves the index of the Gamepress stat rankings JSON,
+        matching each operator's title-cased name to their stats (see
+        index_functions.build_stat_index())."""
+        return self._get_table("stat index", self._load_stat_index)
+
+    def _load_stat_index(self) -> Dict[str, Dict[str, Any]]:
+        """Loads the stat index for the current version of the stat
+        rankings JSON, and returns it.
+
+        Like the name index, the stat rankings are only decoded if
+        they changed since the index was stored. Returns an empty dict
+        if the stat rankings can't be retrieved.
+        """
+        if self._use_snapshot:
+            return load_index(
+                "statIndex",
+                read_snapshot_header()["sources"]["stat_rankings"],
+                lambda: build_stat_index(
+                    load_snapshot_section("stat_rankings")
+                )
+            )
+
+        entry = fetch_json_entry(get_stat_rankings_url())
+        if entry is None:
+            return {}
+
+        return load_index(
+            "statIndex",
+            entry["sha256"],
+            lambda: build_stat_index(get_stat_rankings())
+        )
+
+    def _get_operator_json_version(self) -> Optional[str]:
+        """Retrieves a hash of the character JSON currently in use,
+        from the snapshot if there is one, or from the disk cache
+        otherwise.
+
+        Returns None if the character JSON can't be retrieved.
+        """
+        if self._use_snapshot:
+            return read_snapshot_header()["sources"]["operators"]
+
+        entry = fetch_json_entry(read_line_from_file(
+            "./info/scraper/operatorJsonUrl.txt"
+        ))
+        if entry is None:
+            return None
+
+        return entry["sha256"]
+
+    def _load_name_index(self) -> Optional[Dict[str, str]]:
+        """Loads the name index (see index_functions.build_name_index())
+        for the current version of the character JSON, and returns it.
+
+        The index is only rebuilt (which means decoding the character
+        JSON) if the character JSON or the alias file changed since
+        the index was stored. Returns None if the character JSON
+        can't be retrieved.
+        """
+        replacement_names = read_lines_into_dict(
+            "./info/scraper/jsonOperatorReplacements.txt"
+        )
+        replacements_hash = hashlib.sha1(
+            json.dumps(replacement_names, sort_keys=True).encode("utf8")
+        ).hexdigest()
+
+        # The record index already has every operator's name, so
+        # nothing needs to be decoded to build the name index
+        if self._use_records:
+            return load_index(
+                "nameIndex",
+                self.record_index["version"] + ":" + replacements_hash,
+                lambda: build_name_index(
+                    {
+                        operator_key: {"name": name}
+                        for operator_key, (_, _, name)
+                        in self.record_index["records"].items()
+                    },
+                    replacement_names
+                )
+            )
+
+        operator_json_version = self._get_operator_json_version()
+        if operator_json_version is None:
+            return None
+
+        # Only the names are decoded when streaming, since that's all
+        # the index needs
+        if self._streaming:
+            return load_index(
+                "nameIndex",
+                operator_json_version + ":" + replacements_hash,
+                lambda: build_name_index(
+                    {
+                        operator_key: {
+                            "name": find_json_item([raw_operator], "name")
+                        }
+                        for operator_key, raw_operator in iter_json_items(
+                            iter_cached_body(read_line_from_file(
+                                "./info/scraper/operatorJsonUrl.txt"
+                            ))
+                        )
+                    },
+                    replacement_names
+                )
+            )
+
+        return load_index(
+            "nameIndex",
+            operator_json_version + ":" + replacements_hash,
+            lambda: build_name_index(self.operator_json, replacement_names)
+        )
+
+    def find_operator_key(self, name: str) -> Optional[str]:
+        """Finds the key of an operator in the character JSON using
+        the operator's normalized (title case) name or alias.
+
+        Returns None if no operator has that name, or if the
+        character JSON can't be retrieved.
+        """
+        if self._use_database and not self._use_records:
+            replacement_names = read_lines_into_dict(
+                "./info/scraper/jsonOperatorReplacements.txt"
+            )
+
+            return query_operator_key(
+                self.database,
+                replacement_names.get(name, name)
+            )
+
+        name_index = self._get_table("name index", self._load_name_index)
+        if name_index is None:
+            return None
+
+        return name_index.get(name)
+
+    def is_operator_indexed(self, name: str) -> bool:
+        """Checks whether an operator's normalized (title case) name or
+        alias is in the name index that is already on disk, without
+        sending any requests.
+
+        The stored index may be out of date, so an operator that isn't
+        in it might still be in the character JSON. Returns False if
+        no name index was stored yet.
+        """
+        # The snapshot, record store and database are all local, so
+        # the real lookup is just as quick
+        if self._use_snapshot or self._use_records or self._use_database:
+            return self.find_operator_key(name) is not None
+
+        name_index = read_stored_index("nameIndex")
+
+        return name_index is not None and name in name_index.keys()
+
+    def get_operator(self, operator_key: str) -> Dict[str, Any]:
+        """Retrieves an operator's entry in the character JSON, which
+        has (among other things) the operator's name, rarity,
+        profession, description and tags."""
+        if self._use_records:
+            offset, length, _ = self.record_index["records"][operator_key]
+
+            return self._get_table(
+                "record " + operator_key,
+                lambda: read_operator_record(self.records, offset, length)
+            )
+
+        if self._use_database:
+            return query_operator(self.database, operator_key)
+
+        if self._streaming:
+            return self._get_table(
+                "operator " + operator_key,
+                lambda: self._find_streamed_items(
+                    "./info/scraper/operatorJsonUrl.txt", [operator_key]
+                )[operator_key]
+            )
+
+        return self.operator_json[operator_key]
+
+    def get_operator_stats(self, operator_key: str) -> Dict[str, Any]:
+        """Retrieves an operator's stats, in the format made by
+        json_parser_functions.create_stats_dict()."""
+        if self._use_database:
+            return query_operator_stats(self.database, operator_key)
+
+        return create_stats_dict(self.get_operator(operator_key))
+
+    def get_operator_talents(
+            self,
+            operator_key: str
+    ) -> List[Dict[str, Any]]:
+        """Retrieves every stage of an operator's talents, in the
+        format made by json_parser_functions.extract_talents()."""
+        if self._use_database:
+            return query_operator_talents(self.database, operator_key)
+
+        return extract_talents(self.get_operator(operator_key))
+
+    def get_operator_skill_ids(self, operator_key: str) -> List[str]:
+        """Retrieves the ids of an operator's skills, in order."""
+        if self._use_database:
+            return query_operator_skill_ids(self.database, operator_key)
+
+        operator_dict = self.get_operator(operator_key)
+
+        if "skills" not in operator_dict.keys() \
+                or operator_dict["skills"] is None:
+            return []
+
+        skill_ids = [skill["skillId"] for skill in operator_dict["skills"]]
+
+        # Every one of the operator's skills is found in one walk
+        # through the skill JSON, since they'll all be needed anyways
+        if self._streaming:
+            skills = self._find_streamed_items(
+                "./info/scraper/skillsJsonUrl.txt", skill_ids
+            )
+            for skill_id in skill_ids:
+                self._tables["skill " + skill_id] = skills.get(skill_id)
+
+        return skill_ids
+
+    @property
+    def skills_available(self) -> bool:
+        """Checks to see if the skill JSON could be loaded."""
+        if self._use_database:
+            return True
+
+        if self._streaming:
+            return self._get_streamable_url(
+                "./info/scraper/skillsJsonUrl.txt"
+            ) is not None
+
+        return self.skills_json != {}
+
+    def get_skill_levels(
+            self,
+            skill_id: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Retrieves every level of a skill, in the format made by
+        json_parser_functions.extract_skill_levels().
+
+        Returns None if the skill isn't in the skill JSON.
+        """
+        if self._use_database:
+            return query_skill_levels(self.database, skill_id)
+
+        if self._streaming:
+            skill_info = self._get_table(
+                "skill " + skill_id,
+                lambda: self._find_streamed_items(
+                    "./info/scraper/skillsJsonUrl.txt", [skill_id]
+                ).get(skill_id)
+            )
+
+            return (
+                None if skill_info is None
+                else extract_skill_levels(skill_info)
+            )
+
+        if skill_id not in self.skills_json.keys():
+            return None
+
+        return extract_skill_levels(self.skills_json[skill_id])
+
+    @property
+    def base_skills_available(self) -> bool:
+        """Checks to see if both JSONs needed for base skills could
+        be loaded."""
+        if self._use_database:
+            return True
+
+        if self._streaming:
+            return (
+                self._get_streamable_url(
+                    "./info/scraper/baseSkillsJsonUrl.txt"
+                ) is not None
+                and self._get_streamable_url(
+                    "./info/scraper/riicJsonUrl.txt"
+                ) is not None
+            )
+
+        base_skills_json, riic_json = self.base_jsons
+
+        return base_skills_json != {} and riic_json != {}
+
+    def get_operator_base_skills(
+            self,
+            operator_key: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Retrieves an operator's base skills, in the format made by
+        json_parser_functions.extract_base_skills().
+
+        Returns None if the operator has no entry in the base skills
+        JSON.
+        """
+        if self._use_database:
+            return query_operator_base_skills(self.database, operator_key)
+
+        if self._streaming:
+            return self._stream_base_skills(operator_key)
+
+        base_skills_json, riic_json = self.base_jsons
+
+        return extract_base_skills(operator_key, base_skills_json, riic_json)
+
+    def _stream_base_skills(
+            self,
+            operator_key: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Finds an operator's base skills by streaming only the needed
+        entries out of the base skills and riic JSONs, then builds them
+        the same way extract_base_skills() does.
+
+        Returns None if the operator has no entry in the base skills
+        JSON.
+        """
+        base_skills_url = self._get_streamable_url(
+            "./info/scraper/baseSkillsJsonUrl.txt"
+        )
+        raw_tables = find_raw_json_items(
+            iter_cached_body(base_skills_url), ["chars", "buffs"]
+        )
+
+        char = find_json_item([raw_tables.get("chars", "{}")], operator_key)
+        if char is None:
+            return None
+
+        buff_ids = [
+            bskill["buffId"]
+            for bchar in char["buffChar"]
+            for bskill in bchar["buffData"]
+        ]
+
+        # Only the operator's own buffs are decoded out of both JSONs,
+        # so extract_base_skills() can work on these small versions
+        base_skills_json = {
+            "chars": {operator_key: char},
+            "buffs": find_json_items(
+                [raw_tables.get("buffs", "{}")], buff_ids
+            )
+        }
+        riic_json = self._find_streamed_items(
+            "./info/scraper/riicJsonUrl.txt", buff_ids
+        )
+
+        return extract_base_skills(operator_key, base_skills_json, riic_json)
+
+    def prefetch(self, sources: List[str]) -> None:
+        """Makes sure every specified data source (named the same way as
+        the snapshot sections) is in the disk cache and up to date,
+        downloading all of them at the same time.
+
+        Everything that loads a source later on then finds it already
+        in the disk cache, so a run that needs four JSONs only waits
+        for the slowest one instead of all four in a row. Nothing is
+        done if there is a snapshot, since it already has every source.
+        """
+        if self._use_snapshot or len(sources) == 0:
+            return
+
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            # list() to wait for every download to finish
+            list(executor.map(
+                lambda name: fetch_json_entry(get_source_url(name)),
+                sources
+            ))
+
+    def get_data_version(self, sources: List[str]) -> Optional[str]:
+        """Creates a hash that changes whenever any of the specified
+        data sources change, and returns it. The sources are named the
+        same way as the snapshot sections (eg. "operators", "skills").
+
+        The hashes come from the snapshot if there is one, or from the
+        disk cache otherwise (which asks the server whether a JSON
+        changed once its time-to-live runs out). Returns None if any
+        of the sources can't be retrieved.
+        """
+        if self._use_snapshot:
+            source_hashes = read_snapshot_header()["sources"]
+        else:
+            source_hashes = {}
+
+            for name in sources:
+                entry = fetch_json_entry(get_source_url(name))
+                if entry is None:
+                    return None
+
+                source_hashes[name] = entry["sha256"]
+
+        return hashlib.sha1(
+            ":".join(source_hashes[name] for name in sources).encode("utf8")
+        ).hexdigest()
+
+    def get_data_time(self) -> Optional[float]:
+        """Retrieves when the local operator data was downloaded, as a
+        timestamp, without sending any requests. This is when the
+        snapshot was created if there is one, or when the character
+        JSON was last downloaded otherwise.
+
+        Returns None if there is no local operator data at all.
+        """
+        if self._use_snapshot:
+            return read_snapshot_header()["created"]
+
+        entry = load_cache_entry(read_line_from_file(
+            "./info/scraper/operatorJsonUrl.txt"
+        ))
+        if entry is None:
+            return None
+
+        return entry["fetched"]
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
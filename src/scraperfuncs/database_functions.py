@@ -0,0 +1,650 @@
+"""This module contains all the functions needed for building and
+querying the operator database, a local SQLite database holding the
+normalized contents of Aceship's JSONs."""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+from typing import (
+    Any, Collection, Dict, List, Mapping, Optional, Sequence
+)
+
+from inputfuncs.input_reader import get_temporary_path
+from inputfuncs.cache_functions import get_cache_directory
+from scraperfuncs.json_parser_functions import (
+    create_stats_dict,
+    extract_talents,
+    extract_skill_levels,
+    extract_base_skills
+)
+
+
+DATABASE_SCHEMA = """
+CREATE TABLE operators (
+    operator_key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    title_name TEXT NOT NULL,
+    rarity INTEGER NOT NULL,
+    profession TEXT NOT NULL,
+    description TEXT,
+    item_usage TEXT,
+    item_desc TEXT,
+    attack_interval REAL,
+    deploy_time INTEGER,
+    has_base_skills INTEGER NOT NULL
+);
+CREATE INDEX operators_title_name ON operators (title_name);
+CREATE INDEX operators_rarity ON operators (rarity);
+CREATE INDEX operators_profession ON operators (profession);
+
+CREATE TABLE operator_tags (
+    operator_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (operator_key, position)
+);
+CREATE INDEX operator_tags_tag ON operator_tags (tag);
+
+CREATE TABLE phases (
+    operator_key TEXT NOT NULL,
+    phase INTEGER NOT NULL,
+    max_atk INTEGER,
+    max_def INTEGER,
+    max_hp INTEGER,
+    arts INTEGER,
+    block INTEGER,
+    cost INTEGER,
+    PRIMARY KEY (operator_key, phase)
+);
+
+CREATE TABLE operator_skills (
+    operator_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    skill_id TEXT NOT NULL,
+    PRIMARY KEY (operator_key, position)
+);
+CREATE INDEX operator_skills_skill_id ON operator_skills (skill_id);
+
+CREATE TABLE skills (
+    skill_id TEXT PRIMARY KEY,
+    name TEXT
+);
+
+CREATE TABLE skill_levels (
+    skill_id TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    name TEXT,
+    description TEXT,
+    sp_cost INTEGER,
+    init_sp INTEGER,
+    duration REAL,
+    blackboard TEXT,
+    PRIMARY KEY (skill_id, level)
+);
+
+CREATE TABLE talents (
+    operator_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT,
+    description TEXT,
+    phase INTEGER,
+    level INTEGER,
+    potential_rank INTEGER,
+    PRIMARY KEY (operator_key, position)
+);
+
+CREATE TABLE base_skills (
+    operator_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    buff_id TEXT,
+    name TEXT,
+    buff_name TEXT,
+    room_type TEXT,
+    phase INTEGER,
+    level INTEGER,
+    description TEXT,
+    PRIMARY KEY (operator_key, position)
+);
+
+CREATE TABLE recruit_operators (
+    recruit_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    rarity INTEGER NOT NULL,
+    hidden INTEGER NOT NULL
+);
+CREATE INDEX recruit_operators_name ON recruit_operators (name);
+CREATE INDEX recruit_operators_rarity ON recruit_operators (rarity);
+
+CREATE TABLE recruit_tags (
+    recruit_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (recruit_id, position)
+);
+CREATE INDEX recruit_tags_tag ON recruit_tags (tag);
+"""
+
+# Stored as the database's user_version. Databases built with another
+# schema are built again from scratch instead of being updated.
+DATABASE_VERSION = 2
+
+# The phases create_stats_dict() uses as stat prefixes/suffixes
+PHASE_LEVELS = ["ne", "e1", "e2"]
+
+
+def get_database_path() -> str:
+    """Retrieves the path the operator database is stored at."""
+    return os.path.join(get_cache_directory(), "operators.db")
+
+
+def database_exists() -> bool:
+    """Checks to see if the operator database has been built with
+    `ark sync`."""
+    return os.path.isfile(get_database_path())
+
+
+def read_database_version() -> int:
+    """Reads which version of the schema the operator database was
+    built with (see DATABASE_VERSION)."""
+    connection = sqlite3.connect(
+        "file:" + get_database_path() + "?mode=ro", uri=True
+    )
+    try:
+        return connection.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def connect_to_database() -> sqlite3.Connection:
+    """Opens the operator database (read only) and returns the
+    connection. Rows can be accessed by column name.
+
+    The connection is only ever read from, so it can be shared by
+    lookups running in different threads."""
+    connection = sqlite3.connect(
+        "file:" + get_database_path() + "?mode=ro",
+        uri=True,
+        check_same_thread=False
+    )
+    connection.row_factory = sqlite3.Row
+
+    return connection
+
+
+# Building functions
+def _insert_operators(
+        connection: sqlite3.Connection,
+        operator_json: Mapping[str, Any],
+        base_skills_json: Mapping[str, Any],
+        riic_json: Mapping[str, Any]
+) -> None:
+    """Normalizes every operator in the character JSON (along with
+    their stats, skills, talents and base skills) into the
+    database."""
+    for operator_key, operator_dict in operator_json.items():
+        stats = create_stats_dict(operator_dict)
+        base_skills = extract_base_skills(
+            operator_key, base_skills_json, riic_json
+        )
+
+        connection.execute(
+            "INSERT INTO operators VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+            (
+                operator_key,
+                operator_dict["name"],
+                operator_dict["name"].title(),
+                operator_dict["rarity"],
+                operator_dict["profession"],
+                operator_dict["description"],
+                operator_dict["itemUsage"],
+                operator_dict["itemDesc"],
+                stats.get("atk_int"),
+                stats.get("deploy_time"),
+                base_skills is not None,
+            )
+        )
+
+        connection.executemany(
+            "INSERT INTO operator_tags VALUES (?,?,?)",
+            [
+                (operator_key, position, tag)
+                for position, tag in enumerate(
+                    operator_dict["tagList"] or []
+                )
+            ]
+        )
+
+        connection.executemany(
+            "INSERT INTO phases VALUES (?,?,?,?,?,?,?,?)",
+            [
+                (
+                    operator_key,
+                    phase,
+                    stats[f"max_atk{lvl}"],
+                    stats[f"max_def{lvl}"],
+                    stats[f"max_hp{lvl}"],
+                    stats[f"{lvl}_arts"],
+                    stats[f"{lvl}_block"],
+                    stats[f"{lvl}_cost"],
+                )
+                for phase, lvl in enumerate(PHASE_LEVELS)
+                if f"max_atk{lvl}" in stats.keys()
+            ]
+        )
+
+        connection.executemany(
+            "INSERT INTO operator_skills VALUES (?,?,?)",
+            [
+                (operator_key, position, skill["skillId"])
+                for position, skill in enumerate(
+                    operator_dict.get("skills") or []
+                )
+                if skill["skillId"] is not None
+            ]
+        )
+
+        connection.executemany(
+            "INSERT INTO talents VALUES (?,?,?,?,?,?,?)",
+            [
+                (
+                    operator_key,
+                    position,
+                    talent["name"],
+                    talent["description"],
+                    talent["phase"],
+                    talent["level"],
+                    talent["potential_rank"],
+                )
+                for position, talent in enumerate(
+                    extract_talents(operator_dict)
+                )
+            ]
+        )
+
+        connection.executemany(
+            "INSERT INTO base_skills VALUES (?,?,?,?,?,?,?,?,?)",
+            [
+                (
+                    operator_key,
+                    position,
+                    bskill["buff_id"],
+                    bskill["name"],
+                    bskill["buff_name"],
+                    bskill["room_type"],
+                    bskill["phase"],
+                    bskill["level"],
+                    bskill["description"],
+                )
+                for position, bskill in enumerate(base_skills or [])
+            ]
+        )
+
+
+def _insert_skills(
+        connection: sqlite3.Connection,
+        skills_json: Mapping[str, Any]
+) -> None:
+    """Normalizes every skill (and every level of every skill) in the
+    skill JSON into the database."""
+    for skill_id, skill_info in skills_json.items():
+        skill_levels = extract_skill_levels(skill_info)
+
+        connection.execute(
+            "INSERT INTO skills VALUES (?,?)",
+            (
+                skill_id,
+                skill_levels[0]["name"] if len(skill_levels) > 0 else None
+            )
+        )
+        connection.executemany(
+            "INSERT INTO skill_levels VALUES (?,?,?,?,?,?,?,?)",
+            [
+                (
+                    skill_id,
+                    level + 1,
+                    skill_level["name"],
+                    skill_level["description"],
+                    skill_level["sp_cost"],
+                    skill_level["init_sp"],
+                    skill_level["duration"],
+                    json.dumps(skill_level["blackboard"]),
+                )
+                for level, skill_level in enumerate(skill_levels)
+            ]
+        )
+
+
+def _insert_recruit_tags(
+        connection: sqlite3.Connection,
+        operatortags_list: Sequence[Mapping[str, Any]]
+) -> None:
+    """Normalizes the recruitment tag JSON into the database. The
+    operator's class (`type`) is stored as one of its tags, the same
+    way initialize_operator_list() treats it.
+
+    Every entry of the JSON gets its own row (numbered in the order
+    the JSON lists them), so entries that share a name are all kept,
+    the same way they are without a database."""
+    for recruit_id, operator in enumerate(operatortags_list):
+        connection.execute(
+            "INSERT INTO recruit_operators VALUES (?,?,?,?)",
+            (
+                recruit_id,
+                operator["name_en"],
+                operator["level"],
+                operator["hidden"] or operator.get("globalHidden", False),
+            )
+        )
+        connection.executemany(
+            "INSERT INTO recruit_tags VALUES (?,?,?)",
+            [
+                (recruit_id, position, tag)
+                for position, tag in enumerate(
+                    operator["tags"] + [operator["type"].rstrip()]
+                )
+            ]
+        )
+
+
+# Which tables are built from which snapshot sections, so that only
+# the tables of changed sections have to be built again
+DATABASE_TABLE_GROUPS = {
+    "operators": {
+        "sources": ["operators", "base_skills", "riic"],
+        "tables": [
+            "operators",
+            "operator_tags",
+            "phases",
+            "operator_skills",
+            "talents",
+            "base_skills"
+        ],
+    },
+    "skills": {
+        "sources": ["skills"],
+        "tables": ["skills", "skill_levels"],
+    },
+    "recruit": {
+        "sources": ["recruit"],
+        "tables": ["recruit_operators", "recruit_tags"],
+    },
+}
+
+
+def _insert_table_group(
+        connection: sqlite3.Connection,
+        group: str,
+        sections: Mapping[str, Any]
+) -> None:
+    """Inserts every table in a group (see DATABASE_TABLE_GROUPS)
+    from the sections it is built from."""
+    if group == "operators":
+        _insert_operators(
+            connection,
+            sections["operators"],
+            sections["base_skills"],
+            sections["riic"]
+        )
+    elif group == "skills":
+        _insert_skills(connection, sections["skills"])
+    else:
+        _insert_recruit_tags(connection, sections["recruit"])
+
+
+def build_database(
+        sections: Mapping[str, Any],
+        changed_sources: Optional[Collection[str]] = None
+) -> int:
+    """Builds a new operator database from the sections of a snapshot
+    (see inputfuncs.snapshot_functions), replacing the old database,
+    and returns the size of the new database in bytes.
+
+    If the names of the changed sections are specified and a database
+    already exists, the old database is copied and only the tables
+    built from a changed section are emptied and filled again.
+
+    The database is built in a temporary file first, so queries
+    running at the same time never see a half-built database.
+    """
+    database_path = get_database_path()
+    temporary_path = get_temporary_path(database_path)
+    os.makedirs(os.path.dirname(database_path), exist_ok=True)
+
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+
+    rebuild_everything = (
+        changed_sources is None
+        or not database_exists()
+        or read_database_version() != DATABASE_VERSION
+    )
+    if not rebuild_everything:
+        shutil.copyfile(database_path, temporary_path)
+
+    connection = sqlite3.connect(temporary_path)
+    try:
+        if rebuild_everything:
+            connection.executescript(DATABASE_SCHEMA)
+            connection.execute(f"PRAGMA user_version = {DATABASE_VERSION}")
+
+        for group, group_info in DATABASE_TABLE_GROUPS.items():
+            if not rebuild_everything and not any(
+                    source in changed_sources
+                    for source in group_info["sources"]
+            ):
+                continue  # whoa a bad continue
+
+            if not rebuild_everything:
+                for table in group_info["tables"]:
+                    connection.execute(f"DELETE FROM {table}")
+
+            _insert_table_group(connection, group, sections)
+
+        connection.commit()
+    finally:
+        connection.close()
+
+    os.replace(temporary_path, database_path)
+
+    return os.path.getsize(database_path)
+
+
+# Querying functions
+def query_operator_key(
+        connection: sqlite3.Connection,
+        name: str
+) -> Optional[str]:
+    """Finds the key of the first operator with the specified title
+    case name. Returns None if there isn't one."""
+    row = connection.execute(
+        "SELECT operator_key FROM operators WHERE title_name = ? "
+        + "ORDER BY rowid LIMIT 1",
+        (name,)
+    ).fetchone()
+
+    return row["operator_key"] if row is not None else None
+
+
+def query_operator(
+        connection: sqlite3.Connection,
+        operator_key: str
+) -> Dict[str, Any]:
+    """Retrieves an operator's basic information, with the same keys
+    the character JSON uses (name, rarity, profession, description,
+    itemUsage, itemDesc, tagList)."""
+    row = connection.execute(
+        "SELECT * FROM operators WHERE operator_key = ?",
+        (operator_key,)
+    ).fetchone()
+
+    tags = connection.execute(
+        "SELECT tag FROM operator_tags WHERE operator_key = ? "
+        + "ORDER BY position",
+        (operator_key,)
+    ).fetchall()
+
+    return {
+        "name": row["name"],
+        "rarity": row["rarity"],
+        "profession": row["profession"],
+        "description": row["description"],
+        "itemUsage": row["item_usage"],
+        "itemDesc": row["item_desc"],
+        "tagList": [tag["tag"] for tag in tags],
+    }
+
+
+def query_operator_stats(
+        connection: sqlite3.Connection,
+        operator_key: str
+) -> Dict[str, Any]:
+    """Retrieves an operator's stats, in the same format
+    json_parser_functions.create_stats_dict() makes them in.
+
+    Returns an empty dict if the operator has no stats.
+    """
+    phases = connection.execute(
+        "SELECT * FROM phases WHERE operator_key = ? ORDER BY phase",
+        (operator_key,)
+    ).fetchall()
+
+    if len(phases) == 0:
+        return {}
+
+    stats = {}
+    for phase in phases:
+        lvl = PHASE_LEVELS[phase["phase"]]
+
+        stats[f"max_atk{lvl}"] = phase["max_atk"]
+        stats[f"max_def{lvl}"] = phase["max_def"]
+        stats[f"max_hp{lvl}"] = phase["max_hp"]
+        stats[f"{lvl}_arts"] = phase["arts"]
+        stats[f"{lvl}_block"] = phase["block"]
+        stats[f"{lvl}_cost"] = phase["cost"]
+
+    row = connection.execute(
+        "SELECT attack_interval, deploy_time FROM operators "
+        + "WHERE operator_key = ?",
+        (operator_key,)
+    ).fetchone()
+
+    stats["atk_int"] = row["attack_interval"]
+    stats["deploy_time"] = row["deploy_time"]
+
+    return stats
+
+
+def query_operator_talents(
+        connection: sqlite3.Connection,
+        operator_key: str
+) -> List[Dict[str, Any]]:
+    """Retrieves every stage of an operator's talents, in the same
+    format json_parser_functions.extract_talents() makes them in."""
+    rows = connection.execute(
+        "SELECT name, description, phase, level, potential_rank "
+        + "FROM talents WHERE operator_key = ? ORDER BY position",
+        (operator_key,)
+    ).fetchall()
+
+    return [dict(row) for row in rows]
+
+
+def query_operator_skill_ids(
+        connection: sqlite3.Connection,
+        operator_key: str
+) -> List[str]:
+    """Retrieves the ids of an operator's skills, in order."""
+    rows = connection.execute(
+        "SELECT skill_id FROM operator_skills WHERE operator_key = ? "
+        + "ORDER BY position",
+        (operator_key,)
+    ).fetchall()
+
+    return [row["skill_id"] for row in rows]
+
+
+def query_skill_levels(
+        connection: sqlite3.Connection,
+        skill_id: str
+) -> Optional[List[Dict[str, Any]]]:
+    """Retrieves every level of a skill, in the same format
+    json_parser_functions.extract_skill_levels() makes them in.
+
+    Returns None if the skill isn't in the database.
+    """
+    rows = connection.execute(
+        "SELECT name, description, sp_cost, init_sp, duration, blackboard "
+        + "FROM skill_levels WHERE skill_id = ? ORDER BY level",
+        (skill_id,)
+    ).fetchall()
+
+    if len(rows) == 0:
+        return None
+
+    skill_levels = []
+    for row in rows:
+        skill_level = dict(row)
+        skill_level["blackboard"] = json.loads(row["blackboard"])
+        skill_levels.append(skill_level)
+
+    return skill_levels
+
+
+def query_operator_base_skills(
+        connection: sqlite3.Connection,
+        operator_key: str
+) -> Optional[List[Dict[str, Any]]]:
+    """Retrieves an operator's base skills, in the same format
+    json_parser_functions.extract_base_skills() makes them in.
+
+    Returns None if the operator had no entry in the base skills JSON.
+    """
+    row = connection.execute(
+        "SELECT has_base_skills FROM operators WHERE operator_key = ?",
+        (operator_key,)
+    ).fetchone()
+
+    if row is None or not row["has_base_skills"]:
+        return None
+
+    rows = connection.execute(
+        "SELECT buff_id, name, level, buff_name, room_type, phase, "
+        + "description "
+        + "FROM base_skills WHERE operator_key = ? ORDER BY position",
+        (operator_key,)
+    ).fetchall()
+
+    return [dict(row) for row in rows]
+
+
+def query_recruit_operators(
+        connection: sqlite3.Connection
+) -> List[Dict[str, Any]]:
+    """Retrieves every operator that can be recruited (leaving out
+    hidden operators) as a dict with their name, rarity and tags, in
+    the order the recruitment tag JSON lists them."""
+    rows = connection.execute(
+        "SELECT recruit_operators.recruit_id, recruit_operators.name, "
+        + "recruit_operators.rarity, recruit_tags.tag "
+        + "FROM recruit_operators JOIN recruit_tags USING (recruit_id) "
+        + "WHERE NOT recruit_operators.hidden "
+        + "ORDER BY recruit_id, recruit_tags.position"
+    ).fetchall()
+
+    recruit_operators = {}
+    for row in rows:
+        recruit_operators.setdefault(row["recruit_id"], {
+            "name": row["name"],
+            "rarity": row["rarity"],
+            "tags": [],
+        })["tags"].append(row["tag"])
+
+    return list(recruit_operators.values())
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
@@ -3,9 +3,67 @@ information from Gamepress."""
 
 import re
 import sys
-from bs4 import Tag
+import lxml.html
+from bs4 import BeautifulSoup, Tag
+from lxml import etree
 from inputfuncs.input_reader import read_line_from_file
-from inputfuncs.scraper_functions import scrape_website
+from inputfuncs.scraper_functions import scrape_json
+
+# Every div class on an operator page that something is read from
+OPERATOR_PAGE_CLASSES = [
+    "tag-title",
+    "rarity-cell",
+    "profession-title",
+    "description-box",
+    "skill-cell",
+    "talent-cell",
+    "building-buff-cell",
+    "other-stat-value-cell",
+]
+
+# Finds every section of an operator page that something is read from,
+# which is every div with one of the classes above, and every script
+# without a class (where myStats is)
+_OPERATOR_PAGE_SECTIONS = etree.XPath(
+    " | ".join(
+        "//div[contains(concat(' ', normalize-space(@class), ' '), "
+        + f"' {class_name} ')]"
+        for class_name in OPERATOR_PAGE_CLASSES
+    )
+    + " | //script[not(@class) or normalize-space(@class) = '']"
+)
+
+
+def parse_operator_page(src):
+    """Parses an operator's Gamepress page, and returns a
+    BeautifulSoup object holding only the sections of the page that
+    something is read from (see OPERATOR_PAGE_CLASSES), in the same
+    order as on the page.
+
+    Building a BeautifulSoup tree is slow, and most of an operator
+    page is menus, comments and ads. So the whole page is only parsed
+    by lxml (which is much faster), and only the sections that are
+    actually needed are built into the BeautifulSoup tree.
+    """
+    page = lxml.html.document_fromstring(
+        src,
+        parser=lxml.html.HTMLParser(encoding="utf-8")
+    ) if isinstance(src, bytes) else lxml.html.document_fromstring(src)
+
+    sections = _OPERATOR_PAGE_SECTIONS(page)
+    found_sections = set(sections)
+
+    # A section inside another section already comes with it
+    needed_sections = "".join(
+        lxml.html.tostring(section, encoding="unicode", with_tail=False)
+        for section in sections
+        if not any(
+            ancestor in found_sections
+            for ancestor in section.iterancestors()
+        )
+    )
+
+    return BeautifulSoup(needed_sections, "lxml")
 
 
 def find_siblings_of_breakpoint(soupobj):
@@ -171,7 +229,31 @@ def find_base_skills(soup, images_dict):
     return messages
 
 
-def create_stats_json(soup, operator):
+def get_stat_rankings_url():
+    """Returns the url of the Gamepress stat rankings JSON."""
+    return read_line_from_file(
+        "./info/scraper/url.txt") + "/stat-rankings?_format=json"
+
+
+def get_stat_rankings():
+    """Loads the Gamepress stat rankings JSON, which holds the basic
+    stats of every operator on Gamepress, and returns it.
+
+    Like the Aceship JSONs, the stat rankings go through the disk
+    cache, so they're only downloaded again when they change.
+
+    If the JSON fails to load, this function will return an empty
+    list in place of the JSON file.
+    """
+    stats_info = scrape_json(get_stat_rankings_url())
+
+    if stats_info is None:
+        return []  # Request failed
+
+    return stats_info.json()
+
+
+def create_stats_json(soup, operator, stat_index):
     """Creates the JSON file (dictionary) containing all the operator's stats, and returns it.
 
     This dictionary MUST have the basic operator stats
@@ -180,7 +262,8 @@ def create_stats_json(soup, operator):
     down, or the operator cannot be found.)
 
     This function will first look and load the basic stats
-    (ATK, DEF, HP) for each stage.
+    (ATK, DEF, HP) for each stage from the provided stat rankings
+    index (see index_functions.build_stat_index()).
     Then it will attempt to load (Block, Cost, Res) from the
     operator website under the variable myStats.
     Finally, it will attempt to load (Redeploy Time, Attack Interval)
@@ -191,33 +274,20 @@ def create_stats_json(soup, operator):
     which is essential), this function will simply set
     that attribute's value as -1, indicating failure to retrieve.
     """
-    # Load in the json file for all operators
-    # TODO: should I make a response obj to hold any possible errors?
-
-    # Do this seperately because if I did it every time
-    # that would be a waste of time
-    # for requests that don't need this info.
-    stats_url = read_line_from_file(
-        "./info/scraper/url.txt") + "/stat-rankings?_format=json"
-    stats_info = scrape_website(stats_url)
-
-    if stats_info is None:
+    if len(stat_index) == 0:
         # print("Could not get the JSON file!")
         return {}  # Request failed
 
-    stats_json = None
-    for json_file in stats_info.json():
-        # for json_file in stats_info: # debugging
-        # Find the title so that names like GreyThroat don't screw
-        # up the parser.
-        if json_file["title"].title() == operator:
-            stats_json = json_file
-            break  # whoa a bad break
-
-    if stats_json is None:
+    # The index is keyed by title-cased titles so that names like
+    # GreyThroat don't screw up the parser.
+    if operator not in stat_index.keys():
         # print("No operator found!")
         return {}  # No operator found in the big JSON file
 
+    # Copy so that adding the other stats below doesn't
+    # change the shared index
+    stats_json = dict(stat_index[operator])
+
     # Find myStats from the operator's site
     # This is so we can find res, cost, and block
     good_scripts = soup.find_all("script", "")
@@ -0,0 +1,122 @@
+"""This module contains all the functions needed for building the
+small lookup indexes that are stored next to the cached JSONs, so that
+finding something doesn't require searching through a whole JSON."""
+
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence
+
+from inputfuncs.input_reader import get_temporary_path
+from inputfuncs.cache_functions import get_cache_directory
+
+
+def load_index(
+        index_name: str,
+        version: str,
+        build_index: Callable[[], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Loads a stored index and returns it, rebuilding it first if
+    the stored index was built from a different version of its data.
+
+    The version can be any string that changes whenever the data the
+    index is built from changes (eg. the hash of a cached JSON).
+    `build_index` is only called if the index has to be rebuilt, so
+    an index that is up to date never needs its JSON to be decoded.
+    """
+    index_path = os.path.join(
+        get_cache_directory(), "indexes", index_name + ".json"
+    )
+
+    try:
+        with open(index_path, "r", encoding="utf8") as f:
+            stored_index = json.load(f)
+
+        if stored_index["version"] == version:
+            return stored_index["index"]
+    except (OSError, ValueError, KeyError):
+        pass  # Missing or broken index, so we just rebuild it
+
+    index = build_index()
+
+    # Another process could be building the same index right now
+    temporary_path = get_temporary_path(index_path)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    with open(temporary_path, "w", encoding="utf8") as f:
+        json.dump({"version": version, "index": index}, f)
+    os.replace(temporary_path, index_path)
+
+    return index
+
+
+def read_stored_index(index_name: str) -> Optional[Dict[str, Any]]:
+    """Reads a stored index as it is, without checking which version
+    of its data it was built from, and returns it.
+
+    Returns None if the index was never stored (or is broken).
+    """
+    try:
+        with open(
+                os.path.join(
+                    get_cache_directory(), "indexes", index_name + ".json"
+                ),
+                "r",
+                encoding="utf8"
+        ) as f:
+            return json.load(f)["index"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def build_name_index(
+        operator_json: Mapping[str, Any],
+        replacement_names: Mapping[str, str]
+) -> Dict[str, str]:
+    """Creates a dictionary matching every operator's normalized name
+    (and every alias in `replacement_names`) to that operator's key
+    in the character JSON, and returns it.
+
+    Names are normalized the same way user input is (title case), so
+    that names like "SilverAsh" don't screw up the lookup.
+
+    If two operators share a name, the first one in the JSON wins,
+    just like the old linear search did.
+    """
+    name_index = {}
+
+    for operator_key, operator_dict in operator_json.items():
+        name_index.setdefault(operator_dict["name"].title(), operator_key)
+
+    # Aliases always win over a plain name, since the alias file is
+    # how we say "this name actually means that operator".
+    for alias, proper_name in replacement_names.items():
+        if proper_name in name_index.keys():
+            name_index[alias] = name_index[proper_name]
+        else:
+            name_index.pop(alias, None)
+
+    return name_index
+
+
+def build_stat_index(
+        stat_rankings: Sequence[Mapping[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """Creates a dictionary matching every operator's title-cased
+    Gamepress title to that operator's entry in the Gamepress stat
+    rankings, and returns it.
+
+    If two entries share a title, the first one wins, the same way
+    searching through the list would find it first.
+    """
+    stat_index = {}
+
+    for operator in stat_rankings:
+        stat_index.setdefault(operator["title"].title(), dict(operator))
+
+    return stat_index
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
@@ -103,42 +103,69 @@ def create_stats_dict(operator_dict):
         return {}
 
 
-def parse_talents(operator_dict):
-    """Using the provided operator dictionary from JSON, parses and
-    formats the talents and returns them as a list of strings."""
-    messages = []
-    messages.append("\n\nTalents\n")
+def extract_talents(operator_dict):
+    """Using the provided operator dictionary from JSON, finds every
+    stage of every talent and returns them as a flat list of
+    dictionaries (name, description, phase, level, potential_rank).
+
+    Flattening the talents here means that the formatting in
+    parse_talents() doesn't care where the talents came from
+    (the JSON or the operator database).
+    """
+    talents = []
 
     # We're gonna first make sure everything is there so the
     # program doesn't kill itself.
     if "talents" in operator_dict.keys() \
-            and len(operator_dict["talents"]) > 0:
+            and operator_dict["talents"] is not None:
         # The JSON is well formatted, so our code doesn't
         # need to be too detailed. We can just fetch the data
-        # and format it how we want to.
+        # and format it how we want to later.
         for talent in operator_dict["talents"]:
             for stage in talent["candidates"]:
-                messages.append(
-                    stage["name"] + " - "
-                    + "Lvl " + str(stage["unlockCondition"]["level"])
-                    + " "
-                    + "E" + str(stage["unlockCondition"]["phase"])
-                    + " "
-                    + "Pot" + str(stage["requiredPotentialRank"] + 1)
-                    + " - "
-                )
-                messages.append(
-                    " "
-                    + filter_description(stage["description"])
-                    + "\n"
-                )
+                talents.append({
+                    "name": stage["name"],
+                    "description": stage["description"],
+                    "phase": stage["unlockCondition"]["phase"],
+                    "level": stage["unlockCondition"]["level"],
+                    "potential_rank": stage["requiredPotentialRank"],
+                })
 
-        return messages
-    else:
+    return talents
+
+
+def parse_talents(operator_key, context):
+    """Using an operator's key, retrieves the operator's talents from
+    the provided DataContext, formats them and returns them as a list
+    of strings."""
+    talents = context.get_operator_talents(operator_key)
+
+    if len(talents) == 0:
         # Assuming nothing was found, we can assume this operator
         # has no talents (though I dunno if this will ever run...)
         return ["\n\nTalents\nNo talents found!"]
 
+    messages = []
+    messages.append("\n\nTalents\n")
+
+    for talent in talents:
+        messages.append(
+            talent["name"] + " - "
+            + "Lvl " + str(talent["level"])
+            + " "
+            + "E" + str(talent["phase"])
+            + " "
+            + "Pot" + str(talent["potential_rank"] + 1)
+            + " - "
+        )
+        messages.append(
+            " "
+            + filter_description(talent["description"])
+            + "\n"
+        )
+
+    return messages
+
 
 def get_base_jsons():
     """Loads all the JSONs needed for parsing base skills,
@@ -170,30 +197,64 @@ def get_base_jsons():
     return base_skills_json, riic_json
 
 
-def parse_base_skills(operator_key):
-    """Using an operator's key in the info JSON, finds and assembles
-    a list of strings that contain a formatted description of
-    the operator's base skills, and returns them.
+def extract_base_skills(operator_key, base_skills_json, riic_json):
+    """Using an operator's key in the info JSON, finds every base skill
+    of that operator and returns them as a flat list of dictionaries
+    (buff_id, name, level, buff_name, room_type, phase, description).
 
     Since the base skills info is split across three JSON files,
     we use the key of each operator to find all the base skills of said
     operator using one JSON. Then, we find the details of each of
-    the base skills using another JSON, and format those details to
-    form the final message list.
+    the base skills using another JSON.
 
-    This function will make 2 other requests to other JSON files
-    in order to properly fetch base skills.
+    Returns None if the key can't be found in the base skills JSON.
     """
-    # We'll have to load in two seperate jsons...
-    base_skills_json, riic_json = get_base_jsons()
+    if operator_key not in base_skills_json["chars"].keys():
+        return None
+
+    base_skills = []
 
+    char = base_skills_json["chars"][operator_key]
+    # Looks messy, but needed for traversing the jsons
+    for bchar in char["buffChar"]:
+        for bskill in bchar["buffData"]:
+            # We're just trying to replicate what is got
+            # from gamepress.gg
+            bskill_info = riic_json[bskill["buffId"]]
+
+            zh_bskill_info = \
+                base_skills_json["buffs"][bskill["buffId"]]
+
+            base_skills.append({
+                "buff_id": bskill["buffId"],
+                "name": bskill_info["name"],
+                "level": bskill["cond"]["level"],
+                "buff_name": zh_bskill_info["buffName"],
+                "room_type": zh_bskill_info["roomType"],
+                "phase": bskill["cond"]["phase"],
+                "description": bskill_info["desc"],
+            })
+
+    return base_skills
+
+
+def parse_base_skills(operator_key, context):
+    """Using an operator's key in the info JSON, finds and assembles
+    a list of strings that contain a formatted description of
+    the operator's base skills, and returns them.
+
+    The base skills themselves (see extract_base_skills()) are
+    taken from the provided DataContext, so the JSON files they come
+    from are only requested once per run.
+    """
     # If the jsons fail to load, or if the key can't be found in the
     # base skills json, we have to quit so our program
     # doesn't kill itself.
-    if base_skills_json == {} or riic_json == {}:
+    if not context.base_skills_available:
         return ["\n\nBase Skills\nBase skill JSONs failed to load!"]
 
-    if operator_key not in base_skills_json["chars"].keys():
+    base_skills = context.get_operator_base_skills(operator_key)
+    if base_skills is None:
         return ["\n\nBase Skills\nCould not find matching base skill(s)!"]
 
     messages = []
@@ -206,37 +267,26 @@ def parse_base_skills(operator_key):
         "./info/scraper/formattedJsonRooms.txt"
     )
 
-    char = base_skills_json["chars"][operator_key]
-    # Looks messy, but needed for traversing the jsons
-    for bchar in char["buffChar"]:
-        if len(bchar["buffData"]) > 0:
-            for bskill in bchar["buffData"]:
-                # We're just trying to replicate what is got
-                # from gamepress.gg
-                bskill_info = riic_json[bskill["buffId"]]
-
-                zh_bskill_info = \
-                    base_skills_json["buffs"][bskill["buffId"]]
-
-                messages.append(
-                    bskill_info["name"]
-                    + "  "
-                    + "Lvl: "
-                    + str(bskill["cond"]["level"])
-                    + "  "
-                    + "(" + zh_bskill_info["buffName"] + ")"
-                    + "  "
-                    + "Room Type:  "
-                    + formatted_json_rooms[
-                        zh_bskill_info["roomType"].title()
-                    ]
-                    + "  "
-                    + "E" + str(bskill["cond"]["phase"])
-                )
+    for bskill in base_skills:
+        messages.append(
+            bskill["name"]
+            + "  "
+            + "Lvl: "
+            + str(bskill["level"])
+            + "  "
+            + "(" + bskill["buff_name"] + ")"
+            + "  "
+            + "Room Type:  "
+            + formatted_json_rooms[
+                bskill["room_type"].title()
+            ]
+            + "  "
+            + "E" + str(bskill["phase"])
+        )
 
-                messages.append(
-                    " " + bskill_info["desc"] + "\n"
-                )
+        messages.append(
+            " " + bskill["description"] + "\n"
+        )
 
     return messages
 
@@ -263,45 +313,65 @@ def get_skill_jsons():
     return skills_json
 
 
-def parse_skills(operator_dict, tiers_to_check):
-    """Using an operator info dictionary and specified tiers to
+def extract_skill_levels(skill_info):
+    """Using a skill's entry in the skill JSON, finds every level of
+    the skill and returns them as a flat list of dictionaries
+    (name, description, sp_cost, init_sp, duration, blackboard).
+
+    The list is in order, so the Lv1 skill is at index 0 and the
+    M3 skill (if the skill has masteries) is at index 9.
+    """
+    return [
+        {
+            "name": level["name"],
+            "description": level["description"],
+            "sp_cost": level["spData"]["spCost"],
+            "init_sp": level["spData"]["initSp"],
+            "duration": level["duration"],
+            "blackboard": level["blackboard"],
+        }
+        for level in skill_info["levels"]
+    ]
+
+
+def parse_skills(operator_key, tiers_to_check, context):
+    """Using an operator's key and specified tiers to
     check, parses and assembles a list of messages containing formatted
     information about each tier of skill to check.
 
     Returns a list of messages.
 
-    Since the skills info are stored in a seperate JSON file, we
-    need to load that first in order to properly parse skills.
+    Since the skills info are stored in a seperate JSON file, the
+    skills (see extract_skill_levels()) are retrieved through the
+    provided DataContext in order to properly parse skills.
     """
-    skills_json = get_skill_jsons()
     # If failed to load skills_json
-    if skills_json == {}:
+    if not context.skills_available:
         return ["\n\nSkills\nSkill JSON failed to load!"]
 
+    skill_ids = context.get_operator_skill_ids(operator_key)
+
     # Couldn't find any skills...
-    if "skills" not in operator_dict.keys() \
-            or len(operator_dict["skills"]) <= 0:
+    if len(skill_ids) <= 0:
         return ["\n\nSkills\nNo skills found!"]
 
     messages = []
     messages.append("\n\nOperator Skills")
 
-    for skillnum in range(len(operator_dict["skills"])):
-        skill = operator_dict["skills"][skillnum]
+    for skillnum, skill_id in enumerate(skill_ids):
+        skill_levels = context.get_skill_levels(skill_id)
 
-        if skill["skillId"] in skills_json.keys():
+        if skill_levels is not None:
             messages[-1] += "\n"
 
-            skill_info = skills_json[skill["skillId"]]
-
             # Get the name of the skill
             messages.append(
                 "Skill " + str(skillnum + 1) + ": "
-                + skill_info["levels"][0]["name"]
+                + skill_levels[0]["name"]
             )
 
             for tier in tiers_to_check:
-                skill_tier = skill_info["levels"][tier-1]
+                skill_tier = skill_levels[tier-1]
 
                 # Find the skill point requirements
                 # (eg. cost, inital, etc)
@@ -313,9 +383,9 @@ def parse_skills(operator_dict, tiers_to_check):
 
                 # Variables to save space
                 sp_cost = (
-                    "SP cost: " + str(skill_tier["spData"]["spCost"]))
+                    "SP cost: " + str(skill_tier["sp_cost"]))
                 sp_init = (
-                    "Initial SP: " + str(skill_tier["spData"]["initSp"]))
+                    "Initial SP: " + str(skill_tier["init_sp"]))
                 sp_dur = (
                     "Duration: "
                     + (
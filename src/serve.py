@@ -0,0 +1,78 @@
+"""This module contains all the implementation for the 'serve'
+function in the 'ark' library, which serves a recording made with
+`ark.py --record` over HTTP on this machine.
+
+The recording is laid out by url path, so the server answers at the
+same paths as the real servers. Running any other command with
+`--url-override` (or ARK_URL_OVERRIDE) pointed at the server then
+plays the recording back without the network."""
+
+import argparse
+import functools
+import os
+import sys
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from inputfuncs.record_functions import DEFAULT_RECORD_DIRECTORY
+
+
+class QuietRequestHandler(SimpleHTTPRequestHandler):
+    """A SimpleHTTPRequestHandler that doesn't log every request to the
+    screen, since the scraper can send a lot of them at once.
+
+    Public methods:
+
+    log_message(format, *args)
+
+    """
+
+    def log_message(self, format, *args):
+        """Ignores the log message."""
+
+
+### FUNCTIONS ########################
+
+
+def serve_recording(args: argparse.Namespace) -> None:
+    """Serves a recording directory over HTTP until interrupted.
+    Nothing is returned.
+
+    Only the specified host (by default, only this machine) can
+    reach the server.
+    """
+    directory = args.directory or DEFAULT_RECORD_DIRECTORY
+
+    if not os.path.isdir(directory):
+        sys.stdout.write(
+            f"\n\nThere is no recording at '{directory}'! Record one "
+            + "with `ark.py --record` first.\n\n"
+        )
+        return
+
+    server = ThreadingHTTPServer(
+        (args.host, args.port),
+        functools.partial(QuietRequestHandler, directory=directory)
+    )
+    base_url = f"http://{args.host}:{server.server_address[1]}"
+
+    sys.stdout.write(
+        f"\n\nServing '{directory}' at {base_url}\n\n"
+        + "Play it back with `ark.py --url-override "
+        + base_url
+        + " ...` (or ARK_URL_OVERRIDE="
+        + base_url
+        + "). Press Ctrl+C to stop.\n\n"
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        sys.stdout.write("Stopped.\n\n")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
@@ -0,0 +1,195 @@
+"""This module contains all the implementation for the 'sync'
+function in the 'ark' library, which downloads every data source this
+program uses and compiles them into one compact local snapshot.
+
+Syncing is incremental: a manifest records the hash and validators of
+every source the snapshot was compiled from, so only the sources that
+changed upstream are downloaded and compiled again, and only the
+things built from them are rebuilt."""
+
+import argparse
+import os
+import sys
+
+from halo import Halo  # extremely important
+
+from inputfuncs.input_reader import read_line_from_file
+from inputfuncs.cache_functions import iter_cached_body
+from inputfuncs.json_stream_functions import load_json
+from inputfuncs.scraper_functions import (
+    fetch_json_entry,
+    is_offline_mode
+)
+from inputfuncs.snapshot_functions import (
+    get_snapshot_path,
+    snapshot_exists,
+    load_snapshot_section,
+    operator_records_exist,
+    load_manifest,
+    write_manifest,
+    compile_operators,
+    compile_skills,
+    compile_base_skills,
+    compile_riic,
+    compile_recruit,
+    compile_stat_rankings,
+    write_snapshot,
+    write_operator_records
+)
+from scraperfuncs.gamepress_search_functions import get_stat_rankings_url
+from scraperfuncs.database_functions import (
+    get_database_path,
+    database_exists,
+    build_database
+)
+
+
+### FUNCTIONS ########################
+
+
+def get_source_urls():
+    """Retrieves the url of every data source, matched with the name
+    of the snapshot section that is compiled from it.
+
+    The Gamepress stat rankings are included, even though they are only
+    used for operators that aren't in Aceship's JSONs yet.
+    """
+    return {
+        "operators": read_line_from_file(
+            "./info/scraper/operatorJsonUrl.txt"),
+        "skills": read_line_from_file(
+            "./info/scraper/skillsJsonUrl.txt"),
+        "base_skills": read_line_from_file(
+            "./info/scraper/baseSkillsJsonUrl.txt"),
+        "riic": read_line_from_file(
+            "./info/scraper/riicJsonUrl.txt"),
+        "recruit": read_line_from_file(
+            "./info/recruitops/recruitTagJsonUrl.txt"),
+        "stat_rankings": get_stat_rankings_url(),
+    }
+
+
+def sync_game_data(args: argparse.Namespace) -> None:
+    """Downloads every data source, compiles them into a snapshot,
+    writes the operator record store and builds the operator database
+    from the snapshot, and prints a summary to the screen.
+
+    Every download goes through the disk cache, so sources that haven't
+    changed since they were last downloaded only cost a small request.
+    Only the sources whose hash differs from the one in the manifest
+    are compiled again. The rest are taken from the old snapshot, the
+    record store is only rewritten if the operators changed, and only
+    the database tables built from a changed source are rebuilt.
+
+    If any source fails to download, the old snapshot (if there is one)
+    is left alone. Nothing is returned.
+
+    Syncing needs the network, so nothing is done in offline mode.
+    """
+    if is_offline_mode():
+        sys.stdout.write(
+            "\n\nCan't sync while offline! Run `ark.py sync` "
+            + "without --offline.\n\n"
+        )
+        return
+
+    spinner = Halo(text="Downloading...", spinner="dots", color="magenta")
+    spinner.start()
+
+    compilers = {
+        "operators": compile_operators,
+        "skills": compile_skills,
+        "base_skills": compile_base_skills,
+        "riic": compile_riic,
+        "recruit": compile_recruit,
+        "stat_rankings": compile_stat_rankings,
+    }
+
+    # Without a snapshot to take unchanged sections from, everything
+    # has to be compiled
+    old_sources = (
+        load_manifest()["sources"] if snapshot_exists() else {}
+    )
+
+    manifest_sources = {}
+    changed = []
+    for name, url in get_source_urls().items():
+        spinner.text = f"Downloading {name}..."
+
+        # Whatever the cache's ttl says, a sync always asks the server
+        # whether each source changed
+        entry = fetch_json_entry(url, revalidate=True)
+        if entry is None:
+            spinner.fail("Failed.")
+            sys.stdout.write(
+                f"\n\nCould not download '{url}'! "
+                + "The old snapshot was kept.\n\n"
+            )
+            return
+
+        manifest_sources[name] = {
+            "url": url,
+            "sha256": entry["sha256"],
+            "etag": entry["etag"],
+            "last_modified": entry["last_modified"],
+        }
+
+        if name not in old_sources.keys() \
+                or old_sources[name]["url"] != url \
+                or old_sources[name]["sha256"] != entry["sha256"]:
+            changed.append(name)
+
+    sections = {}
+    for name, source in manifest_sources.items():
+        if name in changed:
+            spinner.text = f"Compiling {name}..."
+            sections[name] = compilers[name](
+                load_json(iter_cached_body(source["url"]))
+            )
+        else:
+            sections[name] = load_snapshot_section(name)
+
+    sources = {
+        name: source["sha256"] for name, source in manifest_sources.items()
+    }
+
+    spinner.text = "Writing..."
+    if len(changed) > 0:
+        write_snapshot(sections, sources)
+    if "operators" in changed or not operator_records_exist():
+        write_operator_records(sections["operators"], sources["operators"])
+
+    if len(changed) > 0 or not database_exists():
+        spinner.text = "Building operator database..."
+        build_database(sections, changed)
+
+    write_manifest(manifest_sources)
+
+    snapshot_size = os.path.getsize(get_snapshot_path())
+    database_size = os.path.getsize(get_database_path())
+
+    spinner.succeed("Success!")
+    sys.stdout.write("\n\nSynced game data\n\n")
+    sys.stdout.write(
+        (
+            "Changed since the last sync: " + ", ".join(changed)
+            if len(changed) > 0
+            else "Nothing changed since the last sync."
+        )
+        + "\n"
+    )
+    sys.stdout.write(
+        f"{len(sections['operators'])} operators, "
+        + f"{len(sections['skills'])} skills, "
+        + f"{len(sections['recruit'])} recruitable operators\n"
+    )
+    sys.stdout.write(
+        f"Snapshot size: {snapshot_size / 1024:.1f} KB\n"
+        + f"Database size: {database_size / 1024:.1f} KB\n\n"
+    )
+
+
+if __name__ == "__main__":
+    sys.stdout.write(
+        "Wrong python file to run! The main file to run is `ark.py`.\n\n"
+    )
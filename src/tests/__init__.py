@@ -0,0 +1,2 @@
+"""The tests for the 'ark' library. Run them from the `src` directory
+with `python -m unittest`."""
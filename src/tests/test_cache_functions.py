@@ -0,0 +1,92 @@
+"""Tests for inputfuncs.cache_functions."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from inputfuncs import cache_functions
+from inputfuncs.cache_functions import (
+    invalidate_cached_page,
+    is_page_cached,
+    load_cached_page,
+    store_cached_page
+)
+
+
+class PageCacheTest(unittest.TestCase):
+    """Tests for the page cache."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings = {"page_ttl": 100, "page_cache_size": 30}
+
+        for name, value in {
+                "get_cache_directory": lambda: directory.name,
+                "get_page_cache_settings": lambda: self.settings,
+        }.items():
+            patcher = mock.patch.object(cache_functions, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def set_last_use(self, url, timestamp):
+        """Pretends a page was last used at the specified time."""
+        page_path = cache_functions._get_page_paths(url)[0]
+        os.utime(page_path, (timestamp, timestamp))
+
+    def test_round_trip(self):
+        """A stored page is loaded back until it is invalidated."""
+        store_cached_page("https://example.com/a", b"page a")
+
+        self.assertTrue(is_page_cached("https://example.com/a"))
+        self.assertEqual(
+            load_cached_page("https://example.com/a"), b"page a"
+        )
+        self.assertTrue(invalidate_cached_page("https://example.com/a"))
+        self.assertFalse(invalidate_cached_page("https://example.com/a"))
+        self.assertIsNone(load_cached_page("https://example.com/a"))
+
+    def test_expired(self):
+        """Pages older than the ttl are only used if allowed."""
+        store_cached_page("https://example.com/a", b"page a")
+        self.settings["page_ttl"] = 0
+
+        self.assertFalse(is_page_cached("https://example.com/a"))
+        self.assertEqual(
+            load_cached_page("https://example.com/a", allow_expired=True),
+            b"page a"
+        )
+        self.assertIsNone(load_cached_page("https://example.com/a"))
+        self.assertIsNone(
+            load_cached_page("https://example.com/a", allow_expired=True)
+        )
+
+    def test_least_recently_used_goes_first(self):
+        """Once the cache is over its size, the pages used longest ago
+        are removed first, and loading a page counts as using it."""
+        for index, url in enumerate(["a", "b", "c"]):
+            store_cached_page("https://example.com/" + url, b"0123456789")
+            self.set_last_use("https://example.com/" + url, 1000 + index)
+
+        load_cached_page("https://example.com/a")
+        store_cached_page("https://example.com/d", b"0123456789")
+
+        self.assertEqual(
+            [
+                url
+                for url in ["a", "b", "c", "d"]
+                if is_page_cached("https://example.com/" + url)
+            ],
+            ["a", "c", "d"]
+        )
+
+    def test_too_big(self):
+        """A page bigger than the whole cache isn't stored."""
+        store_cached_page("https://example.com/a", b"x" * 31)
+
+        self.assertFalse(is_page_cached("https://example.com/a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
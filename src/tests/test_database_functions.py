@@ -0,0 +1,68 @@
+"""Tests for scraperfuncs.database_functions."""
+
+import sqlite3
+import unittest
+
+from scraperfuncs.database_functions import (
+    DATABASE_SCHEMA,
+    _insert_recruit_tags,
+    query_recruit_operators
+)
+
+
+def make_recruit_operator(name, level, tags, hidden=False):
+    """Returns an entry of the recruitment tag JSON."""
+    return {
+        "name_en": name,
+        "level": level,
+        "tags": tags,
+        "type": "Guard ",
+        "hidden": hidden,
+    }
+
+
+class RecruitOperatorsTest(unittest.TestCase):
+    """Tests for the recruitment tables."""
+
+    def setUp(self):
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(DATABASE_SCHEMA)
+        self.addCleanup(self.connection.close)
+
+    def test_json_order_and_tags(self):
+        """Operators come back in the JSON's order with their tags in
+        order, their class last, and hidden operators left out."""
+        _insert_recruit_tags(self.connection, [
+            make_recruit_operator("Melantha", 3, ["DPS"]),
+            make_recruit_operator("Hidden", 5, ["Nuker"], hidden=True),
+            make_recruit_operator("Amiya", 5, ["Caster", "DPS"]),
+        ])
+
+        self.assertEqual(query_recruit_operators(self.connection), [
+            {"name": "Melantha", "rarity": 3, "tags": ["DPS", "Guard"]},
+            {
+                "name": "Amiya",
+                "rarity": 5,
+                "tags": ["Caster", "DPS", "Guard"],
+            },
+        ])
+
+    def test_shared_names(self):
+        """Entries that share a name are all kept."""
+        _insert_recruit_tags(self.connection, [
+            make_recruit_operator("Amiya", 5, ["DPS"]),
+            make_recruit_operator("Amiya", 5, ["Melee"]),
+        ])
+
+        self.assertEqual(
+            [
+                operator["tags"]
+                for operator in query_recruit_operators(self.connection)
+            ],
+            [["DPS", "Guard"], ["Melee", "Guard"]]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
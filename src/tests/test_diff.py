@@ -0,0 +1,44 @@
+"""Tests for diff."""
+
+import unittest
+
+from diff import describe_list_change, get_talent_stage_name
+
+
+def make_stage(phase, potential_rank, description):
+    """Returns a compiled talent stage of a talent named "Tal"."""
+    return {
+        "name": "Tal",
+        "description": description,
+        "unlockCondition": {"phase": phase, "level": 1},
+        "requiredPotentialRank": potential_rank,
+    }
+
+
+class DescribeTalentChangeTest(unittest.TestCase):
+    """Tests for describing talent changes."""
+
+    def setUp(self):
+        self.describe_change = describe_list_change(get_talent_stage_name)
+
+    def test_stages_are_told_apart(self):
+        """A change to one stage of a talent names that stage, even
+        though every stage shares the talent's name."""
+        old = [make_stage(1, 0, "a"), make_stage(2, 0, "b")]
+        new = [make_stage(1, 0, "changed"), make_stage(2, 0, "b")]
+
+        self.assertEqual(self.describe_change(old, new), ["Tal E1 Pot1"])
+
+    def test_added_and_removed_stages(self):
+        """Stages that were added or removed are named too."""
+        old = [make_stage(2, 0, "b"), make_stage(2, 2, "c")]
+        new = [make_stage(2, 0, "b"), make_stage(2, 5, "d")]
+
+        self.assertEqual(
+            self.describe_change(old, new),
+            ["+Tal E2 Pot6", "-Tal E2 Pot3"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
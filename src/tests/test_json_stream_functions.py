@@ -0,0 +1,162 @@
+"""Tests for inputfuncs.json_stream_functions."""
+
+import json
+import unittest
+
+from inputfuncs.json_stream_functions import (
+    find_json_item,
+    find_json_items,
+    find_raw_json_items,
+    iter_json_items,
+    load_json
+)
+
+
+# Has every kind of value, plus the things most likely to be cut in
+# half between chunks (numbers, escapes, brackets inside strings and
+# characters that take more than one byte in utf8)
+OBJECT_DOCUMENT = """{
+    "char_002_amiya": {"name": "Amiya", "rarity": 4, "tags": ["DPS"]},
+    "quote \\" key": "a \\"string\\" with {brackets} and [more]",
+    "numbers": [0, -1, 3058.99, 1e-5, -0.5E+3, 12345678901234567890],
+    "constants": [true, false, null],
+    "empty": [{}, [], ""],
+    "unicode": "Зима \\u00e9 ★ 术师",
+    "nested": {"a": {"b": [1, {"c": "}]"}]}},
+    "last": -7
+}""".encode("utf8")
+
+ARRAY_DOCUMENT = b'[1.5, "two", {"three": [3]}, [], null, -0.25]'
+
+
+def split_into_chunks(document: bytes, size: int):
+    """Returns a document split into chunks of the specified size."""
+    return [
+        document[start:start + size]
+        for start in range(0, len(document), size)
+    ]
+
+
+def every_chunking(document: bytes):
+    """Yields the chunk size and chunks of a document for every chunk
+    size from 1 byte up to the whole document."""
+    for size in range(1, len(document) + 1):
+        yield size, split_into_chunks(document, size)
+
+
+class LoadJsonTest(unittest.TestCase):
+    """Tests for load_json()."""
+
+    def test_numbers_cut_between_chunks(self):
+        """Numbers cut off right after a '.', 'e' or '-' are read
+        whole."""
+        document = (
+            b'{"a": 3058.99, "b": 1e-5, "c": [-0.5E+3, 12], "d": -7}'
+        )
+
+        self.assertEqual(
+            load_json(split_into_chunks(document, 1)),
+            json.loads(document)
+        )
+
+    def test_every_chunk_size(self):
+        """Decoding gives the same result as json.loads() no matter
+        where the chunks are cut."""
+        for document in [OBJECT_DOCUMENT, ARRAY_DOCUMENT]:
+            expected = json.loads(document)
+
+            for size, chunks in every_chunking(document):
+                with self.subTest(document=document[:10], size=size):
+                    self.assertEqual(load_json(chunks), expected)
+
+    def test_string_chunks(self):
+        """Chunks can be strings as well as bytes."""
+        text = OBJECT_DOCUMENT.decode("utf8")
+
+        self.assertEqual(
+            load_json([text[:50], text[50:]]), json.loads(text)
+        )
+
+    def test_empty_documents(self):
+        """Empty objects and arrays decode to empty containers."""
+        self.assertEqual(load_json([b"{", b" }"]), {})
+        self.assertEqual(load_json([b"[]"]), [])
+
+    def test_broken_documents(self):
+        """Documents that aren't JSON raise a ValueError."""
+        for document in [b"", b"nope", b'{"a": 1', b'{"a" 1}', b"[1 2]"]:
+            with self.subTest(document=document):
+                with self.assertRaises(ValueError):
+                    load_json(split_into_chunks(document, 3))
+
+
+class FindJsonItemsTest(unittest.TestCase):
+    """Tests for iter_json_items() and the find_json_* functions."""
+
+    def test_iter_every_chunk_size(self):
+        """Every entry is found with its raw text, which decodes to
+        the same value json.loads() gives, no matter where the chunks
+        are cut."""
+        for document in [OBJECT_DOCUMENT, ARRAY_DOCUMENT]:
+            expected = json.loads(document)
+            if isinstance(expected, list):
+                expected = dict(enumerate(expected))
+
+            for size, chunks in every_chunking(document):
+                with self.subTest(document=document[:10], size=size):
+                    self.assertEqual(
+                        {
+                            key: json.loads(raw_value)
+                            for key, raw_value in iter_json_items(chunks)
+                        },
+                        expected
+                    )
+
+    def test_find_every_chunk_size(self):
+        """Only the wanted entries are returned, decoded."""
+        expected = json.loads(OBJECT_DOCUMENT)
+        keys = ["numbers", "unicode", "last", "missing"]
+
+        for size, chunks in every_chunking(OBJECT_DOCUMENT):
+            with self.subTest(size=size):
+                self.assertEqual(
+                    find_json_items(chunks, keys),
+                    {
+                        key: expected[key]
+                        for key in keys
+                        if key in expected
+                    }
+                )
+
+    def test_find_in_array(self):
+        """Entries in an array are found by their index."""
+        self.assertEqual(
+            find_json_items(split_into_chunks(ARRAY_DOCUMENT, 4), [2, 5]),
+            {2: {"three": [3]}, 5: -0.25}
+        )
+
+    def test_find_stops_early(self):
+        """Nothing after the last wanted entry is read."""
+        chunks = [b'{"a": 1, ', b'"b": 2, ', b"this isn't JSON"]
+
+        self.assertEqual(find_raw_json_items(iter(chunks), ["b"]), {
+            "b": "2"
+        })
+
+    def test_find_nested(self):
+        """Raw text can be searched again to reach nested entries."""
+        raw_value = find_raw_json_items([OBJECT_DOCUMENT], ["nested"])
+
+        self.assertEqual(
+            find_json_item([raw_value["nested"]], "a"),
+            {"b": [1, {"c": "}]"}]}
+        )
+
+    def test_find_missing(self):
+        """Keys that aren't there give None (or are left out)."""
+        self.assertIsNone(find_json_item([OBJECT_DOCUMENT], "missing"))
+        self.assertEqual(find_json_items([OBJECT_DOCUMENT], []), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""Tests for inputfuncs.mirror_functions."""
+
+import unittest
+from unittest import mock
+
+from inputfuncs import mirror_functions
+
+
+MIRRORS = [
+    "https://example.com/real.json",
+    "https://mirror-a.example.com/real.json",
+    "https://mirror-b.example.com/real.json",
+]
+
+
+class RankMirrorsTest(unittest.TestCase):
+    """Tests for rank_mirrors()."""
+
+    def setUp(self):
+        self.scores = {}
+        self.now = 10000.0
+
+        for name, value in {
+                "get_mirror_lists": lambda: {MIRRORS[0]: MIRRORS},
+                "_load_scores": lambda: self.scores,
+                "read_lines_into_dict": lambda file: {
+                    "mirror_cooldown": "300"
+                },
+        }.items():
+            patcher = mock.patch.object(mirror_functions, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.object(
+            mirror_functions.time, "time", lambda: self.now
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def score(self, latency, failures=0, failed=None):
+        """Returns a mirror score."""
+        return {"latency": latency, "failures": failures, "failed": failed}
+
+    def test_url_without_mirrors(self):
+        """A url that isn't in any mirror list only gives itself."""
+        self.assertEqual(
+            mirror_functions.rank_mirrors("https://example.com/other"),
+            ["https://example.com/other"]
+        )
+
+    def test_untried_mirrors_keep_file_order(self):
+        """With nothing recorded, the file's order is kept."""
+        self.assertEqual(mirror_functions.rank_mirrors(MIRRORS[0]), MIRRORS)
+
+    def test_fastest_first(self):
+        """Healthy mirrors are ranked fastest first, and mirrors that
+        were never tried count as the fastest."""
+        self.scores = {
+            MIRRORS[0]: self.score(0.9),
+            MIRRORS[1]: self.score(0.2),
+        }
+
+        self.assertEqual(
+            mirror_functions.rank_mirrors(MIRRORS[0]),
+            [MIRRORS[2], MIRRORS[1], MIRRORS[0]]
+        )
+
+    def test_failed_mirrors_last(self):
+        """Mirrors that failed recently come last, the one that failed
+        the longest ago first."""
+        self.scores = {
+            MIRRORS[0]: self.score(0.1, 1, self.now - 10),
+            MIRRORS[1]: self.score(0.1, 2, self.now - 20),
+            MIRRORS[2]: self.score(0.5),
+        }
+
+        self.assertEqual(
+            mirror_functions.rank_mirrors(MIRRORS[0]),
+            [MIRRORS[2], MIRRORS[1], MIRRORS[0]]
+        )
+
+    def test_cooldown_doubles(self):
+        """A failed mirror is healthy again after the cooldown, which
+        doubles for every failure in a row."""
+        self.scores = {
+            MIRRORS[0]: self.score(0.1, 1, self.now - 301),
+            MIRRORS[1]: self.score(0.1, 2, self.now - 301),
+            MIRRORS[2]: self.score(0.5),
+        }
+
+        self.assertEqual(
+            mirror_functions.rank_mirrors(MIRRORS[0]),
+            [MIRRORS[0], MIRRORS[2], MIRRORS[1]]
+        )
+
+
+class RecordMirrorTest(unittest.TestCase):
+    """Tests for record_mirror_success() and record_mirror_failure()."""
+
+    def setUp(self):
+        self.scores = {}
+
+        for name, value in {
+                "_load_scores": lambda: dict(self.scores),
+                "_write_scores": self.write_scores,
+        }.items():
+            patcher = mock.patch.object(mirror_functions, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write_scores(self, scores):
+        self.scores = scores
+
+    def test_latency_is_averaged(self):
+        """New latencies are blended into the recorded latency."""
+        mirror_functions.record_mirror_success(MIRRORS[1], 1.0)
+        self.assertEqual(self.scores[MIRRORS[1]]["latency"], 1.0)
+
+        mirror_functions.record_mirror_success(MIRRORS[1], 2.0)
+        self.assertAlmostEqual(
+            self.scores[MIRRORS[1]]["latency"],
+            mirror_functions.LATENCY_WEIGHT * 2.0
+            + (1 - mirror_functions.LATENCY_WEIGHT) * 1.0
+        )
+
+    def test_success_clears_failures(self):
+        """Failures add up until the mirror answers again."""
+        mirror_functions.record_mirror_failure(MIRRORS[1])
+        mirror_functions.record_mirror_failure(MIRRORS[1])
+        self.assertEqual(self.scores[MIRRORS[1]]["failures"], 2)
+        self.assertIsNone(self.scores[MIRRORS[1]]["latency"])
+
+        mirror_functions.record_mirror_success(MIRRORS[1], 0.5)
+        self.assertEqual(self.scores[MIRRORS[1]]["failures"], 0)
+        self.assertIsNone(self.scores[MIRRORS[1]]["failed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+"""Tests for inputfuncs.scraper_functions."""
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from inputfuncs import scraper_functions
+from inputfuncs.scraper_functions import fetch_json_entry, single_flight
+
+
+class SingleFlightTest(unittest.TestCase):
+    """Tests for single_flight()."""
+
+    def test_calls_are_shared(self):
+        """Calls with the same key made at the same time only call the
+        function once, and all get its result."""
+        calls = []
+        release = threading.Event()
+        started = threading.Barrier(5 + 1)
+        results = []
+
+        def slow_call(value):
+            calls.append(value)
+            release.wait(5)
+            return value * 2
+
+        def join_flight():
+            started.wait()
+            results.append(single_flight("key", slow_call, 21))
+
+        threads = [threading.Thread(target=join_flight) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+
+        # Give every thread a moment to join the flight before it ends
+        started.wait()
+        while len(calls) == 0:
+            time.sleep(0.01)
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, [21])
+        self.assertEqual(results, [42] * 5)
+
+    def test_later_calls_run_again(self):
+        """A call made after the last one finished calls the function
+        again."""
+        calls = []
+
+        def call():
+            calls.append(None)
+            return len(calls)
+
+        self.assertEqual(single_flight("key", call), 1)
+        self.assertEqual(single_flight("key", call), 2)
+
+    def test_exceptions_are_shared(self):
+        """An exception is raised again for the caller."""
+        def broken_call():
+            raise ValueError("broken")
+
+        with self.assertRaises(ValueError):
+            single_flight("key", broken_call)
+
+        # The failed flight doesn't stick around
+        self.assertEqual(single_flight("key", lambda: 1), 1)
+
+
+class FetchJsonEntryTest(unittest.TestCase):
+    """Tests for fetch_json_entry()."""
+
+    URL = "https://example.com/character_table.json"
+
+    def setUp(self):
+        self.cached_entry = {
+            "sha256": "cached", "etag": None, "last_modified": None
+        }
+        self.response = mock.MagicMock(status_code=200, headers={})
+        self.send_request = mock.Mock(return_value=self.response)
+        scraper_functions._checked_urls.discard(self.URL)
+
+        for name, value in {
+                "load_cache_entry": lambda url: self.cached_entry,
+                "is_cache_entry_fresh": lambda entry: False,
+                "mark_cache_entry_checked": lambda url: None,
+                "send_request": self.send_request,
+                "store_cache_entry": lambda url, chunks, headers: {
+                    "sha256": "downloaded"
+                },
+        }.items():
+            patcher = mock.patch.object(scraper_functions, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_downloaded(self):
+        """A 200 reply is stored and its entry returned."""
+        self.assertEqual(fetch_json_entry(self.URL), {"sha256": "downloaded"})
+
+    def test_not_modified(self):
+        """A 304 reply keeps the cached copy."""
+        self.response.status_code = 304
+
+        self.assertEqual(fetch_json_entry(self.URL), self.cached_entry)
+
+    def test_fresh_cache(self):
+        """A cached copy within its ttl is used without a request,
+        unless revalidate is specified."""
+        with mock.patch.object(
+                scraper_functions,
+                "is_cache_entry_fresh",
+                lambda entry: True
+        ):
+            self.assertEqual(fetch_json_entry(self.URL), self.cached_entry)
+            self.send_request.assert_not_called()
+
+            self.assertEqual(
+                fetch_json_entry(self.URL, revalidate=True),
+                {"sha256": "downloaded"}
+            )
+            self.send_request.assert_called_once()
+
+    def test_server_error_uses_cache(self):
+        """Any other reply (like a 503 that outlasted every retry)
+        falls back on the cached copy."""
+        for status_code in [404, 429, 500, 503]:
+            with self.subTest(status_code=status_code):
+                self.response.status_code = status_code
+
+                self.assertEqual(
+                    fetch_json_entry(self.URL), self.cached_entry
+                )
+
+    def test_request_error_uses_cache(self):
+        """A request that fails falls back on the cached copy."""
+        self.send_request.side_effect = requests.ConnectionError()
+
+        self.assertEqual(fetch_json_entry(self.URL), self.cached_entry)
+
+    def test_server_error_without_cache(self):
+        """With nothing cached, a failed download gives None."""
+        self.cached_entry = None
+        self.response.status_code = 503
+
+        self.assertIsNone(fetch_json_entry(self.URL))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Tests for inputfuncs.snapshot_functions."""
+
+import tempfile
+import unittest
+from unittest import mock
+
+from inputfuncs import snapshot_functions
+from inputfuncs.snapshot_functions import (
+    open_operator_records,
+    operator_records_exist,
+    read_operator_record,
+    write_operator_records
+)
+
+
+def make_operators(names):
+    """Returns a compiled operators section with the specified
+    operator names."""
+    return {
+        f"char_{index}": {"name": name, "rarity": index}
+        for index, name in enumerate(names)
+    }
+
+
+class OperatorRecordsTest(unittest.TestCase):
+    """Tests for the operator record store."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        patcher = mock.patch.object(
+            snapshot_functions,
+            "get_cache_directory",
+            lambda: directory.name
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_all(self, index, records):
+        """Decodes every record in the store."""
+        return {
+            operator_key: read_operator_record(records, offset, length)
+            for operator_key, (offset, length, _)
+            in index["records"].items()
+        }
+
+    def test_round_trip(self):
+        """Every operator written can be read back by its key."""
+        operators = make_operators(["Amiya", "Зима", "W"])
+        write_operator_records(operators, "v1")
+
+        self.assertTrue(operator_records_exist())
+        index, records = open_operator_records()
+        self.assertEqual(index["version"], "v1")
+        self.assertEqual(self.read_all(index, records), operators)
+
+    def test_index_matches_records_after_replace(self):
+        """An opened store keeps reading the records its index points
+        into, even after a sync replaces the store."""
+        old_operators = make_operators(["Amiya", "W"])
+        write_operator_records(old_operators, "v1")
+        index, records = open_operator_records()
+
+        new_operators = make_operators(["A much longer name", "Amiya"])
+        write_operator_records(new_operators, "v2")
+
+        self.assertEqual(self.read_all(index, records), old_operators)
+        self.assertEqual(
+            self.read_all(*open_operator_records()), new_operators
+        )
+
+    def test_old_store_is_ignored(self):
+        """A store from before the index was kept in the same file
+        doesn't count as existing, so the next sync rewrites it."""
+        self.assertFalse(operator_records_exist())
+
+        with open(
+                snapshot_functions.get_operator_records_path(), "wb"
+        ) as f:
+            f.write(b"\x80\x05old pickled records")
+
+        self.assertFalse(operator_records_exist())
+        with self.assertRaises(ValueError):
+            open_operator_records()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""Tests for inputfuncs.token_bucket."""
+
+import unittest
+from unittest import mock
+
+from inputfuncs.token_bucket import TokenBucket
+
+
+class FakeClock:
+    """A clock that only moves when something sleeps on it."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TokenBucketTest(unittest.TestCase):
+    """Tests for TokenBucket."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.multiple(
+            "inputfuncs.token_bucket.time",
+            monotonic=self.clock.monotonic,
+            sleep=self.clock.sleep
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_is_free(self):
+        """A full bucket lets `capacity` requests through at once."""
+        bucket = TokenBucket(2, 3)
+
+        for _ in range(3):
+            bucket.acquire()
+
+        self.assertEqual(self.clock.now, 0.0)
+
+    def test_rate_is_kept(self):
+        """Once the bucket is empty, requests go through at `rate`
+        per second."""
+        bucket = TokenBucket(2, 3)
+
+        for _ in range(3 + 10):
+            bucket.acquire()
+
+        self.assertAlmostEqual(self.clock.now, 10 / 2)
+
+    def test_refills_while_idle(self):
+        """Time spent idle refills the bucket, up to its capacity."""
+        bucket = TokenBucket(1, 2)
+        bucket.acquire()
+        bucket.acquire()
+
+        self.clock.now += 100
+        for _ in range(2):
+            bucket.acquire()
+        self.assertEqual(self.clock.now, 100)
+
+        bucket.acquire()
+        self.assertAlmostEqual(self.clock.now, 101)
+
+    def test_capacity_is_at_least_one(self):
+        """A bucket always holds at least one token."""
+        bucket = TokenBucket(1, 0)
+        bucket.acquire()
+
+        self.assertEqual(bucket.capacity, 1)
+        self.assertEqual(self.clock.now, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()